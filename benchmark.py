@@ -0,0 +1,309 @@
+# benchmark.py
+"""
+End-to-end throughput and scaling benchmark for the QR code pipeline.
+
+Synthesizes realistic URLs and renders them with main.run_pipeline, the same
+config-driven staged thread-pool pipeline used by main.py (including variants,
+payload optimization and archive output when configured), sweeping worker
+counts, output sizes and feature sets. Each scenario runs in a fresh process
+so its peak RSS is not inflated by earlier scenarios.
+
+Example:
+    python benchmark.py --count 500 --workers 1 2 4 8 --sizes 300 1200 --json bench.json
+"""
+import os
+import sys
+import copy
+import json
+import math
+import random
+import logging
+import argparse
+import resource
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Tuple
+from PIL import Image
+from src.config import load_config
+from src.archive_sink import ArchiveSink
+
+FEATURE_SETS = {
+    'plain': {'logo': False, 'gradient': False, 'background': False},
+    'logo': {'logo': True, 'gradient': False, 'background': False},
+    'full': {'logo': True, 'gradient': True, 'background': True},
+}
+
+_DOMAINS = ['example.com', 'shop.example.de', 'instagram.com', 'tiktok.com', 'artistikath.de', 'events.example.org']
+_WORDS = ['product', 'summer', 'sale', 'collection', 'artist', 'gallery', 'ticket', 'menu', 'profile', 'item']
+
+def synthesize_urls(count: int, seed: int = 0) -> List[str]:
+    """
+    Generate realistic URLs of varying length (paths, ids and query strings).
+
+    Parameters:
+        count (int): Number of URLs to generate.
+        seed (int): Seed for reproducible output.
+
+    Returns:
+        List[str]: The generated URLs.
+    """
+    rng = random.Random(seed)
+    urls = []
+    for index in range(count):
+        path = '/'.join(rng.choice(_WORDS) for _ in range(rng.randint(0, 3)))
+        url = f"https://{rng.choice(_DOMAINS)}/{path}"
+        if rng.random() < 0.5:
+            url += f"{'/' if path else ''}{rng.randint(1, 10 ** rng.randint(2, 8))}"
+        if rng.random() < 0.3:
+            url += f"?utm_source=qr&utm_campaign={rng.choice(_WORDS)}{index}"
+        urls.append(url)
+    return urls
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Return the nearest-rank percentile of the values.
+
+    Parameters:
+        values (List[float]): Sample values.
+        fraction (float): Percentile as a fraction (e.g., 0.99).
+
+    Returns:
+        float: The percentile value, or 0.0 for no samples.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+def peak_rss_mib() -> float:
+    """Return the peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def build_scenario_config(base_config: Dict[str, Any], size: int, features: Dict[str, bool],
+                          work_dir: str) -> Dict[str, Any]:
+    """
+    Derive the configuration for one scenario from the base configuration.
+
+    Synthetic logo and background images are created in work_dir when enabled.
+
+    Parameters:
+        base_config (Dict[str, Any]): Validated base configuration data.
+        size (int): Output width and height in pixels.
+        features (Dict[str, bool]): Enabled 'logo', 'gradient' and 'background' steps.
+        work_dir (str): Directory for synthetic input images.
+
+    Returns:
+        dict: The scenario configuration.
+    """
+    config = copy.deepcopy(base_config)
+    config['qr_code'].update({'width': size, 'height': size, 'scale': 1.0, 'background_image': None})
+    config['appearance']['gradient'] = {'enabled': features['gradient'], 'start_color': '#000000', 'end_color': '#3050a0'}
+    config.setdefault('logo', {}).setdefault('shape', 'circle')
+    config['output']['logo_path'] = None
+    archive_path = config['output'].get('archive_path')
+    if archive_path:
+        # Keep archive output (including '-' for stdout) inside the scenario directory
+        config['output']['archive_path'] = os.path.join(work_dir, f"bench.{config['output'].get('archive_format', 'zip')}")
+
+    if features['logo']:
+        logo_path = os.path.join(work_dir, 'logo.png')
+        Image.new('RGBA', (256, 256), (220, 40, 40, 255)).save(logo_path)
+        config['output']['logo_path'] = logo_path
+    if features['background']:
+        background_path = os.path.join(work_dir, 'background.png')
+        Image.new('RGBA', (size, size), (240, 230, 200, 255)).save(background_path)
+        config['qr_code']['background_image'] = background_path
+    return config
+
+def run_scenario(config_path: str, urls: List[str], workers: int, size: int, feature_set: str) -> Dict[str, Any]:
+    """
+    Render all URLs once with the given worker count, size and feature set.
+
+    Latency is measured from the moment the encode stage picks up a code until all
+    its outputs are written; the time spent waiting in the bounded input queue
+    before that is reported separately as queue wait.
+
+    Parameters:
+        config_path (str): Path to the base configuration file.
+        urls (List[str]): Payloads to render.
+        workers (int): Threads per pipeline stage.
+        size (int): Output width and height in pixels.
+        feature_set (str): Key of FEATURE_SETS.
+
+    Returns:
+        dict: Throughput, latency and queue wait percentiles, peak RSS and stage statistics.
+    """
+    base_config = load_config(config_path)
+    original_dir = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # main writes to relative output and log directories, so run it inside work_dir.
+        # It is imported here, in the scenario process, for the same reason.
+        os.chdir(work_dir)
+        try:
+            import main
+            logging.getLogger().setLevel(logging.WARNING)
+
+            config = build_scenario_config(base_config, size, FEATURE_SETS[feature_set], work_dir)
+            config['pipeline'] = {
+                'enabled': True,
+                'encode_workers': workers,
+                'compose_workers': workers,
+                'save_workers': workers,
+                'queue_size': max(8, workers * 4),
+            }
+            jobs = [(f"Bench{index}", url) for index, url in enumerate(urls)]
+            if config['qr_code'].get('optimize_payload'):
+                jobs = main.optimize_jobs(jobs, config)
+
+            submitted: Dict[str, float] = {}
+            started: Dict[str, float] = {}
+            latencies: List[float] = []
+            queue_waits: List[float] = []
+            lock = threading.Lock()
+
+            def submit() -> Iterator[Tuple[str, str]]:
+                for job in jobs:
+                    submitted[job[0]] = perf_counter()
+                    yield job
+
+            def on_start(service_name: str) -> None:
+                now = perf_counter()
+                with lock:
+                    started[service_name] = now
+                    queue_waits.append(now - submitted[service_name])
+
+            def on_done(service_name: str) -> None:
+                now = perf_counter()
+                with lock:
+                    latencies.append(now - started[service_name])
+
+            archive_path = config['output'].get('archive_path')
+            sink = ArchiveSink(archive_path, config['output'].get('archive_format', 'zip')) if archive_path else None
+            start_time = perf_counter()
+            try:
+                stage_report = main.run_pipeline(submit(), 'bench', config, sink, on_done, on_start)
+            finally:
+                if sink is not None:
+                    sink.close()
+            wall_time = perf_counter() - start_time
+        finally:
+            os.chdir(original_dir)
+
+    return {
+        'workers': workers,
+        'size': size,
+        'features': feature_set,
+        'codes': len(urls),
+        'wall_time': wall_time,
+        'codes_per_sec': len(urls) / wall_time if wall_time else 0.0,
+        'p50_latency_ms': percentile(latencies, 0.50) * 1000,
+        'p99_latency_ms': percentile(latencies, 0.99) * 1000,
+        'p50_queue_wait_ms': percentile(queue_waits, 0.50) * 1000,
+        'p99_queue_wait_ms': percentile(queue_waits, 0.99) * 1000,
+        'peak_rss_mib': peak_rss_mib(),
+        'stages': stage_report,
+    }
+
+def add_parallel_efficiency(results: List[Dict[str, Any]]) -> None:
+    """
+    Add 'parallel_efficiency' to each result, relative to the smallest worker count
+    measured for the same size and feature set.
+
+    Parameters:
+        results (List[Dict[str, Any]]): Scenario results from run_scenario.
+    """
+    baselines: Dict[Tuple[int, str], Dict[str, Any]] = {}
+    for result in results:
+        key = (result['size'], result['features'])
+        if key not in baselines or result['workers'] < baselines[key]['workers']:
+            baselines[key] = result
+    for result in results:
+        baseline = baselines[(result['size'], result['features'])]
+        per_worker = baseline['codes_per_sec'] / baseline['workers']
+        result['parallel_efficiency'] = result['codes_per_sec'] / (per_worker * result['workers']) if per_worker else 0.0
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    """
+    Format benchmark results as a plain-text table.
+
+    Parameters:
+        results (List[Dict[str, Any]]): Scenario results with parallel efficiency.
+
+    Returns:
+        str: The formatted table.
+    """
+    header = (f"{'features':<8} {'size':>5} {'workers':>7} {'codes/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'wait p50':>9} {'wait p99':>9} {'RSS MiB':>8} {'eff':>6}")
+    lines = [header, '-' * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['features']:<8} {r['size']:>5} {r['workers']:>7} {r['codes_per_sec']:>9.1f} "
+            f"{r['p50_latency_ms']:>8.1f} {r['p99_latency_ms']:>8.1f} "
+            f"{r['p50_queue_wait_ms']:>9.1f} {r['p99_queue_wait_ms']:>9.1f} {r['peak_rss_mib']:>8.1f} "
+            f"{r['parallel_efficiency']:>6.0%}"
+        )
+    return '\n'.join(lines)
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """
+    Parse the benchmark command line options.
+
+    Parameters:
+        argv (List[str], optional): Arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end QR code throughput and scaling.")
+    parser.add_argument('--config', default=os.getenv('CONFIG_PATH', 'config/settings.yaml'),
+                        help="Base configuration file (default: $CONFIG_PATH or config/settings.yaml).")
+    parser.add_argument('--count', type=int, default=200, help="Number of synthetic URLs per scenario.")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help="Threads per stage to sweep.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[300, 1200], help="Output sizes (px) to sweep.")
+    parser.add_argument('--features', nargs='+', choices=sorted(FEATURE_SETS), default=['plain', 'full'],
+                        help="Feature sets to sweep.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for URL synthesis.")
+    parser.add_argument('--json', metavar='PATH', help="Also write the results as JSON to PATH.")
+    return parser.parse_args(argv)
+
+def main(argv: List[str] = None) -> List[Dict[str, Any]]:
+    """
+    Run the benchmark sweep and report the results.
+
+    Parameters:
+        argv (List[str], optional): Command line arguments. Defaults to sys.argv.
+
+    Returns:
+        List[Dict[str, Any]]: The scenario results.
+    """
+    args = parse_args(argv)
+    urls = synthesize_urls(args.count, args.seed)
+    context = multiprocessing.get_context('spawn')
+
+    results = []
+    for feature_set in args.features:
+        for size in args.sizes:
+            for workers in args.workers:
+                # A fresh process per scenario keeps peak RSS figures independent
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(run_scenario, args.config, urls, workers, size, feature_set).result()
+                print(f"{feature_set} size={size} workers={workers}: {result['codes_per_sec']:.1f} codes/s",
+                      file=sys.stderr)
+                results.append(result)
+
+    add_parallel_efficiency(results)
+    print(format_table(results))
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+    return results
+
+if __name__ == '__main__':
+    main()
@@ -1,114 +1,354 @@
 # main.py
-from src.qr_generator import generate_qr_code
-from src.image_utils import apply_gradient, apply_background_image
-from src.logo_embedder import add_logo_to_qr
+from src.renderer import build_output_name, encode_qr, compose_qr, render_qr
+from src.variants import load_variants, generate_qr_mask, compose_from_mask, render_variants
+from src.batch_raster import rasterize_masks
+from src.payload_optimizer import canonicalize_url, optimize_payload
+from src.pipeline import StagedPipeline, log_pipeline_report
+from src.sharding import Checkpoint, archive_key, parse_shard, record_key, select_shard, shard_path
+from src.profiling import MemoryTracer, profile_call
+from src.archive_sink import ArchiveSink
 from src.utils import validate_url, validate_configuration
 from src.config import load_config, get_config_path
 from src.logger import configure_logging, log_execution_time
-from src.file_utils import ensure_directory_exists
+from src.file_utils import save_image
+from PIL import Image
+from contextlib import nullcontext
+import argparse
 import logging
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 import os
 
 # Initialize logging
 configure_logging()
 
-@log_execution_time
-def main() -> None:
+OUTPUT_DIR = './files/output_logo'
+CHECKPOINT_DIR = './files/checkpoints'
+
+def collect_jobs(config: Dict[str, Any]) -> Tuple[List[Tuple[str, str]], str]:
     """
-    Main function to load configuration and generate QR codes for each URL.
+    Collect the (service name, URL) pairs to render from the 'data' section.
+
+    Parameters:
+        config (Dict[str, Any]): Validated configuration data.
+
+    Returns:
+        tuple: The list of (service name, URL) pairs and the base file name.
+
+    Raises:
+        ValueError: If no URL is provided or a URL is invalid.
     """
-    try:
-        config_path = get_config_path()
-        config = load_config(config_path)
-        validate_configuration(config)
+    data_section = config['data']
+    website = data_section.get('website')
+    instagram = data_section.get('instagram')
+    tiktok = data_section.get('tiktok')
+
+    # Ensure at least one URL is provided
+    if not any([website, instagram, tiktok]):
+        raise ValueError("At least one URL must be provided in 'data' section (website, instagram, or tiktok).")
+
+    jobs = []
+    for service_name, url in (('Website', website), ('Instagram', instagram), ('TikTok', tiktok)):
+        if url:
+            validate_url(url)
+            jobs.append((service_name, url))
+
+    # Base file name
+    base_name = os.path.basename(website or instagram or tiktok).replace('https://', '').replace('http://', '').replace('/', '')
+    return jobs, base_name
+
+def generate_and_save_qr(data: str, service_name: str, base_name: str, config: Dict[str, Any],
+                         sink: Optional[ArchiveSink] = None) -> None:
+    """
+    Render a QR code with logo and its colorway variants, and write them to the
+    output directory or archive sink.
+
+    With variants configured the payload is encoded once into a mask, from which
+    the primary image and every variant are derived.
+
+    Parameters:
+        data (str): The data to encode in the QR code.
+        service_name (str): Name of the service (e.g., 'Website').
+        base_name (str): Base name derived from the primary URL.
+        config (Dict[str, Any]): Validated configuration data.
+        sink (ArchiveSink, optional): Archive to write into instead of individual files.
+    """
+    logging.info(f"Adding logo to the {service_name} QR code...")
+    variants = load_variants(config)
+    if not variants:
+        write_output(render_qr(data, config), service_name, base_name, config, sink)
+        return
 
-        data_section = config['data']
-        website = data_section.get('website')
-        instagram = data_section.get('instagram')
-        tiktok = data_section.get('tiktok')
+    mask = generate_qr_mask(data, config)
+    write_output(compose_from_mask(mask, config), service_name, base_name, config, sink)
+    for variant, variant_img in render_variants(data, config, variants, mask):
+        write_output(variant_img, service_name, base_name, config, sink, variant)
 
-        # Ensure at least one URL is provided
-        if not any([website, instagram, tiktok]):
-            raise ValueError("At least one URL must be provided in 'data' section (website, instagram, or tiktok).")
+def write_output(qr_img: Image.Image, service_name: str, base_name: str, config: Dict[str, Any],
+                 sink: Optional[ArchiveSink] = None, variant: Optional[str] = None) -> None:
+    """
+    Write a composed QR code to the output directory or archive sink.
 
-        # Validate URLs
-        if website:
-            validate_url(website)
-        if instagram:
-            validate_url(instagram)
-        if tiktok:
-            validate_url(tiktok)
+    Parameters:
+        qr_img (Image.Image): The composed QR code image.
+        service_name (str): Name of the service (e.g., 'Website').
+        base_name (str): Base name derived from the primary URL.
+        config (Dict[str, Any]): Validated configuration data.
+        sink (ArchiveSink, optional): Archive to write into instead of individual files.
+        variant (str, optional): Name of the colorway variant, if any.
+    """
+    file_name = build_output_name(service_name, base_name, variant)
+    if sink is not None:
+        # Members are PNG like the files written by save_image, matching the '.png' name
+        sink.write_image(qr_img, file_name)
+        logging.info(f"{service_name} QR code archived as {file_name}")
+    else:
+        output_path = f"{OUTPUT_DIR}/{file_name}"
+        save_image(qr_img, output_path)
+        logging.info(f"{service_name} QR code saved as {output_path}")
+
+def run_pipeline(jobs: Iterable[Tuple[str, str]], base_name: str, config: Dict[str, Any],
+                 sink: Optional[ArchiveSink] = None,
+                 on_done: Optional[Callable[[str], None]] = None,
+                 on_start: Optional[Callable[[str], None]] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Render the jobs with the staged pipeline configured in the 'pipeline' section.
+
+    Encoding, composing and encoding-to-bytes/saving run in separate thread pools
+    connected by bounded queues, so the stages of different codes overlap.
+
+    Parameters:
+        jobs (Iterable[Tuple[str, str]]): (service name, URL) pairs to render.
+        base_name (str): Base name derived from the primary URL.
+        config (Dict[str, Any]): Validated configuration data.
+        sink (ArchiveSink, optional): Archive to write into instead of individual files.
+        on_done (Callable[[str], None], optional): Called with the service name once all
+            outputs of a job are written.
+        on_start (Callable[[str], None], optional): Called with the service name when the
+            encode stage picks up a job, i.e. after it has left the input queue.
+
+    Returns:
+        dict: Per-stage statistics keyed by stage name.
+    """
+    pipeline_config = config.get('pipeline') or {}
+    variants = load_variants(config)
 
-        # Base file name
-        base_name = os.path.basename(website or instagram or tiktok).replace('https://', '').replace('http://', '').replace('/', '')
+    def encode_stage(job: Tuple[str, str]) -> Tuple[str, str, Image.Image]:
+        service_name, url = job
+        if on_start is not None:
+            on_start(service_name)
+        # With variants the mask is the only encode; the primary image is derived from it
+        return service_name, url, generate_qr_mask(url, config) if variants else encode_qr(url, config)
+
+    def compose_stage(item: Tuple[str, str, Image.Image]) -> Tuple[str, List[Tuple[Optional[str], Image.Image]]]:
+        service_name, url, qr_img = item
+        if not variants:
+            return service_name, [(None, compose_qr(qr_img, config))]
+        images = [(None, compose_from_mask(qr_img, config))]
+        images.extend(render_variants(url, config, variants, qr_img))
+        return service_name, images
+
+    def save_stage(item: Tuple[str, List[Tuple[Optional[str], Image.Image]]]) -> None:
+        service_name, images = item
+        for variant, qr_img in images:
+            write_output(qr_img, service_name, base_name, config, sink, variant)
+        if on_done is not None:
+            on_done(service_name)
+
+    pipeline = StagedPipeline(
+        [
+            ('encode', encode_stage, pipeline_config.get('encode_workers', 2)),
+            ('compose', compose_stage, pipeline_config.get('compose_workers', 4)),
+            ('save', save_stage, pipeline_config.get('save_workers', 2)),
+        ],
+        queue_size=pipeline_config.get('queue_size', 32)
+    )
+    report = pipeline.run(jobs)
+    log_pipeline_report(report)
+    return report
+
+def optimize_jobs(jobs: List[Tuple[str, str]], config: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Canonicalize the URL of every job and log the QR size saved by the payload optimizer.
+
+    Parameters:
+        jobs (List[Tuple[str, str]]): (service name, URL) pairs to render.
+        config (Dict[str, Any]): Validated configuration data.
+
+    Returns:
+        List[Tuple[str, str]]: The jobs with canonical URLs.
+    """
+    optimized = []
+    modules_before = modules_after = 0
+    for service_name, url in jobs:
+        report = optimize_payload(url, config)
+        modules_before += report['modules_before'] ** 2
+        modules_after += report['modules_after'] ** 2
+        optimized.append((service_name, report['payload']))
+    if modules_before:
+        logging.info(f"Payload optimization: {modules_before} -> {modules_after} modules in total "
+                     f"({1 - modules_after / modules_before:.0%} smaller).")
+    return optimized
+
+def run_batched(jobs: List[Tuple[str, str]], base_name: str, config: Dict[str, Any],
+                sink: Optional[ArchiveSink] = None, on_done: Optional[Callable[[str], None]] = None) -> None:
+    """
+    Render the jobs with the batched NumPy rasterizer, one chunk of 'qr_code.batch_size' at a time.
+
+    The primary image and the colorway variants of each job are derived from its batched mask.
+
+    Parameters:
+        jobs (List[Tuple[str, str]]): (service name, URL) pairs to render.
+        base_name (str): Base name derived from the primary URL.
+        config (Dict[str, Any]): Validated configuration data.
+        sink (ArchiveSink, optional): Archive to write into instead of individual files.
+        on_done (Callable[[str], None], optional): Called with the service name once all
+            outputs of a job are written.
+    """
+    batch_size = config['qr_code'].get('batch_size', 256)
+    variants = load_variants(config)
+    for start in range(0, len(jobs), batch_size):
+        chunk = jobs[start:start + batch_size]
+        masks = rasterize_masks([url for _, url in chunk], config)
+        for (service_name, url), mask in zip(chunk, masks):
+            write_output(compose_from_mask(mask, config), service_name, base_name, config, sink)
+            for variant, variant_img in render_variants(url, config, variants, mask):
+                write_output(variant_img, service_name, base_name, config, sink, variant)
+            if on_done is not None:
+                on_done(service_name)
+
+def run(config: Dict[str, Any], shard: Tuple[int, int] = (0, 1), checkpoint_path: Optional[str] = None) -> None:
+    """
+    Generate QR codes for every URL in a validated configuration.
+
+    With several shards only the records whose URL hashes to this shard are
+    rendered, so independent nodes can split a job without a coordinator.
+    Completed records are appended to the checkpoint file, keyed on their
+    output names (including variants) and encoded payload, and skipped when
+    the run is restarted. With an archive, every resumed run writes a new
+    archive part, so the parts of earlier runs are kept.
+
+    Parameters:
+        config (Dict[str, Any]): Validated configuration data.
+        shard (Tuple[int, int]): Shard index and shard count.
+        checkpoint_path (str, optional): Checkpoint file. Sharded runs default to
+            CHECKPOINT_DIR/shard-i-of-N.txt; unsharded runs only checkpoint when it is set.
+    """
+    jobs, base_name = collect_jobs(config)
+
+    index, count = shard
+    if count > 1:
+        jobs = select_shard(jobs, index, count, payload=lambda job: job[1])
+        logging.info(f"Shard {index}/{count}: {len(jobs)} record(s) assigned.")
+        checkpoint_path = checkpoint_path or f"{CHECKPOINT_DIR}/shard-{index}-of-{count}.txt"
+
+    # A key names every output file of the record and hashes the payload that is encoded,
+    # so adding variants or canonicalizing a URL renders the record again
+    variant_names = [variant['name'] for variant in load_variants(config)]
+    optimize = config['qr_code'].get('optimize_payload')
+    keys = {
+        service_name: record_key(
+            ','.join(build_output_name(service_name, base_name, variant) for variant in [None, *variant_names]),
+            canonicalize_url(url) if optimize else url
+        )
+        for service_name, url in jobs
+    }
+    checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+    try:
+        if checkpoint is not None:
+            jobs = [job for job in jobs if not checkpoint.is_done(keys[job[0]])]
+        if not jobs:
+            logging.info("No QR codes left to generate.")
+            return
+        if config['qr_code'].get('optimize_payload'):
+            jobs = optimize_jobs(jobs, config)
 
         logging.info("Starting QR code generation...")
 
-        def generate_and_save_qr(data: str, service_name: str):
-            file_path = f"./files/output/{service_name}@{base_name}_QR.png"
-            output_path = f"./files/output_logo/{service_name}@{base_name}_QR_with_logo.png"
-
-            # Ensure directories exist
-            ensure_directory_exists(os.path.dirname(file_path))
-            ensure_directory_exists(os.path.dirname(output_path))
-
-            fill_color = config['appearance']['fill_color']
-            back_color = config['appearance']['back_color']
-            logo_size_ratio = config['appearance']['logo_size_ratio']
-            padding = config['appearance']['padding']
-            foreground_pattern = config['appearance'].get('foreground_pattern', 'squares')
-            gradient = config['appearance'].get('gradient')
-            logo_shape = config['logo']['shape']
-
-            qr_code_config = config['qr_code']
-            version = qr_code_config['version']
-            error_correction = qr_code_config['error_correction']
-            box_size = qr_code_config['box_size']
-            border = qr_code_config['border']
-            width = qr_code_config['width']
-            height = qr_code_config['height']
-            quiet_zone = qr_code_config['quiet_zone']
-            background_image = qr_code_config.get('background_image')
-            scale = qr_code_config['scale']
-
-            qr_img = generate_qr_code(
-                data,
-                fill_color=fill_color,
-                back_color=back_color,
-                version=version,
-                box_size=box_size,
-                border=border,
-                width=width,
-                height=height,
-                error_correction=error_correction,
-                quiet_zone=quiet_zone,
-                scale=scale
-            )
-
-            # Apply gradient if enabled
-            if gradient and gradient.get('enabled'):
-                qr_img = apply_gradient(qr_img, gradient['start_color'], gradient['end_color'])
-
-            # Apply background image if provided
-            if background_image and os.path.exists(background_image):
-                qr_img = apply_background_image(qr_img, background_image)
-
-            logging.info(f"Adding logo to the {service_name} QR code...")
-
-            # Use the logo path directly from the configuration
-            logo_path = config['output']['logo_path']
-            add_logo_to_qr(qr_img, logo_path, output_path, logo_size_ratio=logo_size_ratio, padding=padding, shape=logo_shape)
-
-            logging.info(f"{service_name} QR code saved as {output_path}")
-
-        # Generate QR codes for each URL
-        if website:
-            generate_and_save_qr(website, 'Website')
-        if instagram:
-            generate_and_save_qr(instagram, 'Instagram')
-        if tiktok:
-            generate_and_save_qr(tiktok, 'TikTok')
+        archive_path = config['output'].get('archive_path')
+        sink = None
+        if archive_path:
+            archive_path = shard_path(archive_path, index, count)
+            if checkpoint is not None:
+                archive_path = checkpoint.next_archive_part(archive_path)
+            sink = ArchiveSink(archive_path, config['output'].get('archive_format', 'zip'))
+
+        # Individual files are checkpointed as soon as they are written. An archive is only
+        # usable once it is closed, so its records are checkpointed together afterwards.
+        on_done = None
+        if checkpoint is not None and sink is None:
+            on_done = lambda service_name: checkpoint.mark_done(keys[service_name])
+        try:
+            # Generate QR codes for each URL
+            if (config.get('pipeline') or {}).get('enabled'):
+                run_pipeline(jobs, base_name, config, sink, on_done)
+            elif config['qr_code'].get('batch_rasterize'):
+                run_batched(jobs, base_name, config, sink, on_done)
+            else:
+                for service_name, url in jobs:
+                    generate_and_save_qr(url, service_name, base_name, config, sink)
+                    if on_done is not None:
+                        on_done(service_name)
+        finally:
+            if sink is not None:
+                sink.close()
+
+        if checkpoint is not None and sink is not None:
+            # The part is recorded first, so a torn write never leaves records in an unrecorded part
+            checkpoint.mark_done(archive_key(archive_path), *(keys[service_name] for service_name, _ in jobs))
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+def _shard_arg(spec: str) -> Tuple[int, int]:
+    try:
+        return parse_shard(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse the command line options.
+
+    Parameters:
+        argv (List[str], optional): Arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Generate QR codes from the configured URLs.")
+    parser.add_argument('--profile', metavar='PATH', nargs='?', const='./logs/profile.pstats',
+                        help="Run under cProfile and write a .pstats file plus a top-N summary "
+                             "(default: ./logs/profile.pstats).")
+    parser.add_argument('--profile-top', metavar='N', type=int, default=20,
+                        help="Number of hot functions in the profile summary (default: 20).")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Trace allocations with tracemalloc and report peak memory per stage.")
+    parser.add_argument('--shard', metavar='i/N', type=_shard_arg, default=(0, 1),
+                        help="Only render the records whose URL hashes to shard i of N (0 <= i < N).")
+    parser.add_argument('--checkpoint', metavar='PATH',
+                        help="Record completed records in PATH and skip them when the run is restarted "
+                             f"(default for sharded runs: {CHECKPOINT_DIR}/shard-i-of-N.txt).")
+    return parser.parse_args(argv)
+
+@log_execution_time
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Main function to load configuration and generate QR codes for each URL.
+
+    Parameters:
+        argv (List[str], optional): Command line arguments. Defaults to sys.argv.
+    """
+    args = parse_args(argv)
+    try:
+        config_path = get_config_path()
+        config = load_config(config_path)
+        validate_configuration(config)
+
+        with MemoryTracer() if args.trace_memory else nullcontext():
+            if args.profile:
+                profile_call(lambda: run(config, args.shard, args.checkpoint), args.profile, args.profile_top)
+            else:
+                run(config, args.shard, args.checkpoint)
 
     except ValueError as ve:
         logging.error(f"Configuration error: {ve}")
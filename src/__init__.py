@@ -7,21 +7,28 @@ Public API:
 - apply_background_image
 - add_logo_to_qr
 - save_image
+- encode_image
 - ensure_directory_exists
 - load_config
 - validate_url
 - validate_configuration
 - configure_logging
 - log_execution_time
+- render_qr
+- ArchiveSink
+- render_batch
 """
 
 from src.qr_generator import generate_qr_code
 from src.image_utils import apply_gradient, apply_background_image
 from src.logo_embedder import add_logo_to_qr
-from src.file_utils import save_image, ensure_directory_exists
+from src.file_utils import save_image, encode_image, ensure_directory_exists
 from src.config import load_config
 from src.utils import validate_url, validate_configuration
 from src.logger import configure_logging, log_execution_time
+from src.renderer import render_qr
+from src.archive_sink import ArchiveSink
+from src.batch_raster import render_batch
 
 __all__ = [
     'generate_qr_code',
@@ -29,12 +36,16 @@ __all__ = [
     'apply_background_image',
     'add_logo_to_qr',
     'save_image',
+    'encode_image',
     'ensure_directory_exists',
     'load_config',
     'validate_url',
     'validate_configuration',
     'configure_logging',
-    'log_execution_time'
+    'log_execution_time',
+    'render_qr',
+    'ArchiveSink',
+    'render_batch'
 ]
 
 # Ensure the module works even if a specific import fails
@@ -54,7 +65,7 @@ except ImportError as e:
     print(f"Warning: {e}. Logo embedding might not be available.")
 
 try:
-    from src.file_utils import save_image, ensure_directory_exists
+    from src.file_utils import save_image, encode_image, ensure_directory_exists
 except ImportError as e:
     print(f"Warning: {e}. File utilities might not be available.")
 
@@ -72,3 +83,18 @@ try:
     from src.logger import configure_logging, log_execution_time
 except ImportError as e:
     print(f"Warning: {e}. Logging setup and execution time tracking might not be available.")
+
+try:
+    from src.renderer import render_qr
+except ImportError as e:
+    print(f"Warning: {e}. Rendering pipeline might not be available.")
+
+try:
+    from src.archive_sink import ArchiveSink
+except ImportError as e:
+    print(f"Warning: {e}. Archive output might not be available.")
+
+try:
+    from src.batch_raster import render_batch
+except ImportError as e:
+    print(f"Warning: {e}. Batched rasterization might not be available.")
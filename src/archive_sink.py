@@ -0,0 +1,116 @@
+# src/archive_sink.py
+import io
+import os
+import sys
+import time
+import logging
+import tarfile
+import zipfile
+import threading
+from typing import BinaryIO, Optional
+from PIL import Image
+from src.file_utils import ensure_directory_exists, encode_image
+
+SUPPORTED_ARCHIVE_FORMATS = ('zip', 'tar')
+
+class ArchiveSink:
+    """
+    Output sink that streams encoded images into a single ZIP or tar archive.
+
+    Members are appended in one sequential pass, so the archive can be written
+    to a regular file or to a non-seekable stream such as stdout ('-').
+    ZIP members are stored uncompressed because PNG data is already compressed.
+    Writes are serialized, so the sink can be shared between worker threads.
+    """
+
+    def __init__(self, path: str, archive_format: str = 'zip') -> None:
+        """
+        Open the archive for writing.
+
+        Parameters:
+            path (str): Path to the archive file, or '-' to write to stdout.
+            archive_format (str): Archive format ('zip', 'tar').
+
+        Raises:
+            ValueError: If an unsupported archive format is provided.
+        """
+        archive_format = archive_format.lower()
+        if archive_format not in SUPPORTED_ARCHIVE_FORMATS:
+            logging.error(f"Unsupported archive format: {archive_format}")
+            raise ValueError("Unsupported archive format. Supported formats are 'zip' and 'tar'.")
+
+        self.path = path
+        self.archive_format = archive_format
+        self.count = 0
+        self._lock = threading.Lock()
+
+        self._owns_stream = path != '-'
+        if self._owns_stream:
+            ensure_directory_exists(os.path.dirname(path) or '.')
+            self._stream: BinaryIO = open(path, 'wb')
+        else:
+            self._stream = sys.stdout.buffer
+
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        if archive_format == 'zip':
+            self._zip = zipfile.ZipFile(self._stream, mode='w', compression=zipfile.ZIP_STORED)
+        else:
+            # 'w|' writes a plain, uncompressed tar stream without seeking
+            self._tar = tarfile.open(fileobj=self._stream, mode='w|')
+
+        logging.info(f"Writing {archive_format} archive to: {'stdout' if path == '-' else path}")
+
+    def write_bytes(self, name: str, payload: bytes) -> None:
+        """
+        Append a member with the given name and content to the archive.
+
+        Parameters:
+            name (str): Member name inside the archive.
+            payload (bytes): Member content.
+        """
+        with self._lock:
+            if self._zip is not None:
+                info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_STORED
+                self._zip.writestr(info, payload)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = len(payload)
+                info.mtime = int(time.time())
+                self._tar.addfile(info, io.BytesIO(payload))
+            self.count += 1
+        logging.debug(f"Archived {name} ({len(payload)} bytes)")
+
+    def write_image(self, img: Image.Image, name: str, image_format: str = 'PNG') -> None:
+        """
+        Encode the image and append it to the archive.
+
+        Encoding happens outside the write lock so several threads can encode at once.
+
+        Parameters:
+            img (Image.Image): The image to archive.
+            name (str): Member name inside the archive.
+            image_format (str): The output format (e.g., 'PNG', 'JPEG').
+        """
+        self.write_bytes(name, encode_image(img, image_format))
+
+    def close(self) -> None:
+        """Finalize the archive and release the underlying stream."""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+        if self._owns_stream:
+            self._stream.close()
+        else:
+            self._stream.flush()
+        logging.info(f"Archive closed with {self.count} file(s): {'stdout' if self.path == '-' else self.path}")
+
+    def __enter__(self) -> 'ArchiveSink':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,117 @@
+# src/batch_raster.py
+import logging
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+import qrcode
+from PIL import Image
+from src.variants import compose_from_mask
+from src.profiling import track_memory
+from src.payload_optimizer import add_optimized_data
+
+def build_matrix(data: str, config: Dict[str, Any]) -> np.ndarray:
+    """
+    Encode the data into a boolean module matrix, including the quiet zone.
+
+    Uses the same 'qr_code' settings as generate_qr_code.
+
+    Parameters:
+        data (str): The data to encode in the QR code.
+        config (Dict[str, Any]): Validated configuration data.
+
+    Returns:
+        np.ndarray: A (modules, modules) boolean array, True for dark modules.
+    """
+    qr_code_config = config['qr_code']
+    qr = qrcode.QRCode(
+        version=qr_code_config['version'],
+        error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{qr_code_config['error_correction']}"),
+        box_size=qr_code_config['box_size'],
+        border=max(qr_code_config['border'], qr_code_config['quiet_zone']),
+    )
+    if qr_code_config.get('optimize_payload'):
+        add_optimized_data(qr, data, qr_code_config['version'])
+    else:
+        qr.add_data(data)
+    qr.make(fit=True)
+    return np.array(qr.get_matrix(), dtype=bool)
+
+def group_by_size(matrices: Sequence[np.ndarray]) -> Dict[int, Tuple[List[int], np.ndarray]]:
+    """
+    Stack matrices of the same size into (N, modules, modules) arrays.
+
+    Parameters:
+        matrices (Sequence[np.ndarray]): Module matrices from build_matrix.
+
+    Returns:
+        dict: Module count -> (positions in the input, stacked boolean array).
+    """
+    positions: Dict[int, List[int]] = {}
+    for position, matrix in enumerate(matrices):
+        positions.setdefault(matrix.shape[0], []).append(position)
+    return {
+        modules: (indices, np.stack([matrices[index] for index in indices]))
+        for modules, indices in positions.items()
+    }
+
+def expand_modules(matrices: np.ndarray, box_size: int) -> np.ndarray:
+    """
+    Upscale a stack of module matrices to pixel masks in one block-expansion pass.
+
+    Parameters:
+        matrices (np.ndarray): (N, modules, modules) boolean array.
+        box_size (int): Pixels per module.
+
+    Returns:
+        np.ndarray: (N, modules * box_size, modules * box_size) uint8 array, 255 for dark modules.
+    """
+    count, rows, cols = matrices.shape
+    levels = matrices.view(np.uint8) * np.uint8(255)
+    # Broadcasting each module over a box_size x box_size block is the kron-style expansion
+    blocks = np.broadcast_to(levels[:, :, None, :, None], (count, rows, box_size, cols, box_size))
+    return blocks.reshape(count, rows * box_size, cols * box_size)
+
+@track_memory
+def rasterize_masks(payloads: Sequence[str], config: Dict[str, Any]) -> List[Image.Image]:
+    """
+    Rasterize a batch of payloads into grayscale masks (255 = module).
+
+    Equivalent to calling generate_qr_mask for each payload, but the module-to-pixel
+    expansion runs once per group of same-sized codes, and the final resize works on
+    a single channel instead of RGBA. The whole batch is expanded at once, so callers
+    bound memory by passing at most 'qr_code.batch_size' payloads.
+
+    Parameters:
+        payloads (Sequence[str]): The data to encode, one QR code per entry.
+        config (Dict[str, Any]): Validated configuration data.
+
+    Returns:
+        List[Image.Image]: 'L' mode masks in the order of the payloads.
+    """
+    qr_code_config = config['qr_code']
+    box_size = qr_code_config['box_size']
+    scale = qr_code_config['scale']
+    size = (int(qr_code_config['width'] * scale), int(qr_code_config['height'] * scale))
+
+    masks: List[Image.Image] = [None] * len(payloads)
+    matrices = [build_matrix(data, config) for data in payloads]
+    for modules, (indices, stacked) in group_by_size(matrices).items():
+        pixels = expand_modules(stacked, box_size)
+        logging.debug(f"Rasterized {len(indices)} code(s) of {modules}x{modules} modules in one batch.")
+        for offset, index in enumerate(indices):
+            # fromarray wraps the contiguous per-code view without copying it
+            mask = Image.fromarray(pixels[offset], mode='L')
+            masks[index] = mask.resize(size, Image.LANCZOS) if mask.size != size else mask.copy()
+    return masks
+
+def render_batch(payloads: Sequence[str], config: Dict[str, Any]) -> List[Image.Image]:
+    """
+    Render a batch of payloads with the configured colors, gradient, background and logo.
+
+    Parameters:
+        payloads (Sequence[str]): The data to encode, one QR code per entry.
+        config (Dict[str, Any]): Validated configuration data.
+
+    Returns:
+        List[Image.Image]: Composed RGBA images in the order of the payloads.
+    """
+    return [compose_from_mask(mask, config) for mask in rasterize_masks(payloads, config)]
@@ -1,7 +1,9 @@
 # src/file_utils.py
+import io
 import os
 import logging
 from PIL import Image
+from src.profiling import track_memory
 
 def ensure_directory_exists(directory: str) -> None:
     """
@@ -14,6 +16,7 @@ def ensure_directory_exists(directory: str) -> None:
         logging.info(f"Creating directory: {directory}")
         os.makedirs(directory, exist_ok=True)
 
+@track_memory
 def save_image(img: Image.Image, file_path: str) -> None:
     """
     Save the image to the specified file path.
@@ -25,3 +28,20 @@ def save_image(img: Image.Image, file_path: str) -> None:
     ensure_directory_exists(os.path.dirname(file_path))
     img.save(file_path)
     logging.info(f"Image saved to: {file_path}")
+
+
+@track_memory
+def encode_image(img: Image.Image, image_format: str = 'PNG') -> bytes:
+    """
+    Encode the image into an in-memory byte string.
+
+    Parameters:
+        img (Image.Image): The image to encode.
+        image_format (str): The output format (e.g., 'PNG', 'JPEG').
+
+    Returns:
+        bytes: The encoded image data.
+    """
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format)
+    return buffer.getvalue()
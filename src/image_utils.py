@@ -1,5 +1,6 @@
 from PIL import Image, ImageDraw
 import logging
+from src.profiling import track_memory
 
 def hex_to_rgb(hex_color: str) -> tuple:
     """
@@ -14,6 +15,7 @@ def hex_to_rgb(hex_color: str) -> tuple:
     hex_color = hex_color.lstrip('#')
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
+@track_memory
 def apply_gradient(img: Image.Image, start_color: str, end_color: str) -> Image.Image:
     """
     Apply a gradient to the QR code image.
@@ -41,6 +43,7 @@ def apply_gradient(img: Image.Image, start_color: str, end_color: str) -> Image.
 
     return Image.alpha_composite(gradient, img)
 
+@track_memory
 def apply_background_image(qr_img: Image.Image, background_image: str) -> Image.Image:
     """
     Apply a background image to the QR code.
@@ -2,20 +2,27 @@ from PIL import Image, ImageDraw
 import logging
 import os
 from .file_utils import ensure_directory_exists, save_image
+from .profiling import track_memory
+from typing import Tuple
 
-def add_logo_to_qr(qr_img: Image.Image, logo_path: str, output_path: str,
-                   logo_size_ratio: int = 5, padding: int = 10, shape: str = 'square') -> None:
+LogoLayer = Tuple[Image.Image, Tuple[int, int], Image.Image, Image.Image, Tuple[int, int]]
+
+def prepare_logo_layer(size: Tuple[int, int], logo_path: str, logo_size_ratio: int = 5,
+                       padding: int = 10, shape: str = 'square') -> LogoLayer:
     """
-    Add a logo to the center of the QR code.
+    Load, resize and mask the logo once for QR code images of the given size.
 
     Parameters:
-        qr_img (Image.Image): The QR code image.
+        size (Tuple[int, int]): Size of the QR code images the layer is applied to.
         logo_path (str): Path to the logo image file.
-        output_path (str): Path to save the QR code with the logo.
         logo_size_ratio (int): Ratio to determine the size of the logo.
         padding (int): Padding around the logo.
         shape (str): Shape of the logo area ('circle', 'square').
 
+    Returns:
+        tuple: The resized logo, its position, the logo mask, and the cleared-area
+            mask with its position.
+
     Raises:
         FileNotFoundError: If the logo file does not exist.
         ValueError: If an unsupported shape is provided.
@@ -26,7 +33,7 @@ def add_logo_to_qr(qr_img: Image.Image, logo_path: str, output_path: str,
         raise FileNotFoundError(f"Logo file not found: {logo_path}")
 
     logo = Image.open(logo_path).convert("RGBA")
-    qr_width, qr_height = qr_img.size
+    qr_width, qr_height = size
     logo_size = (qr_width // logo_size_ratio, qr_height // logo_size_ratio)
     logo = logo.resize(logo_size, Image.LANCZOS)
 
@@ -44,7 +51,7 @@ def add_logo_to_qr(qr_img: Image.Image, logo_path: str, output_path: str,
         raise ValueError("Unsupported shape. Supported shapes are 'circle' and 'square'.")
 
     # Create a central area in the QR code based on the shape and padding
-    area_mask = Image.new('L', qr_img.size, 0)
+    area_mask = Image.new('L', size, 0)
     draw = ImageDraw.Draw(area_mask)
     if shape == 'circle':
         circle_diameter = logo.size[0] + padding
@@ -61,12 +68,75 @@ def add_logo_to_qr(qr_img: Image.Image, logo_path: str, output_path: str,
             fill=255
         )
 
+    # Keep only the bounding box of the area so pasting it touches as few pixels as possible
+    area_box = area_mask.getbbox() or (0, 0, 1, 1)
+    return logo, pos, mask, area_mask.crop(area_box), area_box[:2]
+
+def apply_logo_layer(qr_img: Image.Image, layer: LogoLayer) -> Image.Image:
+    """
+    Clear the central area of the QR code and paste a prepared logo layer.
+
+    Parameters:
+        qr_img (Image.Image): The QR code image.
+        layer (LogoLayer): Layer returned by prepare_logo_layer for this image size.
+
+    Returns:
+        Image.Image: A copy of the QR code image with the logo embedded.
+    """
+    logo, pos, mask, area_mask, area_pos = layer
+
     # Apply the area mask to create a clean center
     qr_img_with_area = qr_img.copy()
-    qr_img_with_area.paste((255, 255, 255), (0, 0), area_mask)
+    qr_img_with_area.paste((255, 255, 255), area_pos, area_mask)
 
     # Paste the logo using the mask
     qr_img_with_area.paste(logo, pos, mask)
+    return qr_img_with_area
+
+@track_memory
+def embed_logo(qr_img: Image.Image, logo_path: str, logo_size_ratio: int = 5,
+               padding: int = 10, shape: str = 'square') -> Image.Image:
+    """
+    Embed a logo in the center of the QR code without saving the result.
+
+    Parameters:
+        qr_img (Image.Image): The QR code image.
+        logo_path (str): Path to the logo image file.
+        logo_size_ratio (int): Ratio to determine the size of the logo.
+        padding (int): Padding around the logo.
+        shape (str): Shape of the logo area ('circle', 'square').
+
+    Returns:
+        Image.Image: A copy of the QR code image with the logo embedded.
+
+    Raises:
+        FileNotFoundError: If the logo file does not exist.
+        ValueError: If an unsupported shape is provided.
+    """
+    layer = prepare_logo_layer(qr_img.size, logo_path, logo_size_ratio=logo_size_ratio,
+                               padding=padding, shape=shape)
+    return apply_logo_layer(qr_img, layer)
+
+@track_memory
+def add_logo_to_qr(qr_img: Image.Image, logo_path: str, output_path: str,
+                   logo_size_ratio: int = 5, padding: int = 10, shape: str = 'square') -> None:
+    """
+    Add a logo to the center of the QR code and save it.
+
+    Parameters:
+        qr_img (Image.Image): The QR code image.
+        logo_path (str): Path to the logo image file.
+        output_path (str): Path to save the QR code with the logo.
+        logo_size_ratio (int): Ratio to determine the size of the logo.
+        padding (int): Padding around the logo.
+        shape (str): Shape of the logo area ('circle', 'square').
+
+    Raises:
+        FileNotFoundError: If the logo file does not exist.
+        ValueError: If an unsupported shape is provided.
+    """
+    qr_img_with_area = embed_logo(qr_img, logo_path, logo_size_ratio=logo_size_ratio,
+                                  padding=padding, shape=shape)
 
     # Ensure directory exists before saving
     ensure_directory_exists(os.path.dirname(output_path))
@@ -0,0 +1,183 @@
+# src/payload_optimizer.py
+import re
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+import qrcode
+from qrcode import util
+
+# Modes in the order used by the segmentation tables below
+_MODES = (util.MODE_8BIT_BYTE, util.MODE_ALPHA_NUM, util.MODE_NUMBER)
+_ALPHANUMERIC = set(util.ALPHA_NUM.decode('ascii'))
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+# Representative versions of the three character-count-indicator size classes
+_VERSION_CLASSES = (1, 10, 27)
+
+def canonicalize_url(url: str) -> str:
+    """
+    Rewrite a URL into an equivalent form that encodes more compactly.
+
+    Only components that are case-insensitive by definition are changed: the
+    scheme and an ASCII host are uppercased (so they fit QR alphanumeric mode),
+    a default port is dropped, percent-escapes use uppercase hex digits, and a
+    bare '/' path is removed. Paths, queries, fragments and user info are kept
+    as they are, since servers may treat them case-sensitively.
+
+    Parameters:
+        url (str): The URL to canonicalize.
+
+    Returns:
+        str: The canonical URL.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+
+    userinfo, _, hostport = parts.netloc.rpartition('@')
+    host, port = hostport, ''
+    match = re.fullmatch(r'(.*?)(?::(\d*))?', hostport)
+    if match and not hostport.endswith(']'):
+        host, port = match.group(1), match.group(2) or ''
+    if port and int(port) == _DEFAULT_PORTS.get(scheme):
+        port = ''
+    # Non-ASCII (IDN) hosts are left alone: str.upper() is not a safe case mapping for them
+    if host.isascii():
+        host = host.upper()
+    netloc = f"{userinfo + '@' if userinfo else ''}{host}{':' + port if port else ''}"
+
+    path = parts.path
+    if path == '/' and not parts.query and not parts.fragment:
+        path = ''
+
+    canonical = urlunsplit((scheme.upper(), netloc, path, parts.query, parts.fragment))
+    return re.sub(r'%[0-9a-fA-F]{2}', lambda escape: escape.group(0).upper(), canonical)
+
+def _char_modes(data: str, version: int) -> List[int]:
+    """Pick the cheapest mode for every character (dynamic programming over segment costs)."""
+    # Costs are in sixths of a bit: numeric 10/3, alphanumeric 11/2 and byte 8 bits per character
+    head_costs = [(4 + util.length_in_bits(mode, version)) * 6 for mode in _MODES]
+    prev_costs = list(head_costs)
+    char_modes: List[List[int]] = []
+    for char in data:
+        cur_costs = [prev_costs[0] + len(char.encode('utf-8')) * 8 * 6, None, None]
+        from_modes = [_MODES[0], None, None]
+        if char in _ALPHANUMERIC:
+            cur_costs[1] = prev_costs[1] + 33
+            from_modes[1] = _MODES[1]
+        if '0' <= char <= '9':
+            cur_costs[2] = prev_costs[2] + 20
+            from_modes[2] = _MODES[2]
+        # Ending the current segment after this character and opening one in another mode
+        ended = [(-(-cost // 6) * 6, k) for k, cost in enumerate(cur_costs) if cost is not None]
+        for j in range(len(_MODES)):
+            for cost, k in ended:
+                if cur_costs[j] is None or cost + head_costs[j] < cur_costs[j]:
+                    cur_costs[j] = cost + head_costs[j]
+                    from_modes[j] = _MODES[k]
+        char_modes.append(from_modes)
+        prev_costs = cur_costs
+
+    # Trace the cheapest ending state back to the first character
+    mode = _MODES[min(range(len(_MODES)), key=lambda index: prev_costs[index])]
+    result = [0] * len(data)
+    for position in range(len(data) - 1, -1, -1):
+        mode = char_modes[position][_MODES.index(mode)]
+        result[position] = mode
+    return result
+
+def segment_payload(data: str, version: int = 1) -> List[util.QRData]:
+    """
+    Split the data into numeric, alphanumeric and byte segments with the fewest total bits.
+
+    Parameters:
+        data (str): The data to segment.
+        version (int): QR version whose character-count field sizes are assumed.
+
+    Returns:
+        List[util.QRData]: Segments to add to a qrcode.QRCode in order.
+    """
+    if not data:
+        return [util.QRData(data, mode=util.MODE_8BIT_BYTE)]
+    segments = []
+    start = 0
+    modes = _char_modes(data, version)
+    for end in range(1, len(data) + 1):
+        if end == len(data) or modes[end] != modes[start]:
+            chunk = data[start:end]
+            segments.append(util.QRData(chunk.encode('utf-8'), mode=modes[start], check_data=False))
+            start = end
+    return segments
+
+def add_optimized_data(qr: qrcode.QRCode, data: str, version: Optional[int] = None) -> None:
+    """
+    Add the data to a QR code using the segmentation that yields the smallest version.
+
+    The best segmentation depends on the character-count field sizes, which change at
+    versions 10 and 27, so one candidate is built per size class and the smallest kept.
+
+    Parameters:
+        qr (qrcode.QRCode): The QR code to add the data to.
+        data (str): The data to encode.
+        version (int, optional): Minimum version, as passed to qrcode.QRCode.
+    """
+    best: Optional[Tuple[int, List[util.QRData]]] = None
+    for size_class in _VERSION_CLASSES:
+        segments = segment_payload(data, size_class)
+        # best_fit only sizes the bit stream; it does not build the module matrix
+        candidate = qrcode.QRCode(error_correction=qr.error_correction)
+        for segment in segments:
+            candidate.add_data(segment)
+        fitted = candidate.best_fit(start=version)
+        if best is None or fitted < best[0]:
+            best = (fitted, segments)
+    for segment in best[1]:
+        qr.add_data(segment)
+
+def measure_payload(data: str, config: Dict[str, Any], optimize_segments: bool = False) -> Tuple[int, int]:
+    """
+    Return the QR version and module count the data encodes to with the 'qr_code' settings.
+
+    Parameters:
+        data (str): The data to encode.
+        config (Dict[str, Any]): Validated configuration data.
+        optimize_segments (bool): Use add_optimized_data instead of qrcode's default chunking.
+
+    Returns:
+        tuple: The version and the number of modules per side (without quiet zone).
+    """
+    qr_code_config = config['qr_code']
+    qr = qrcode.QRCode(
+        error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{qr_code_config['error_correction']}"),
+    )
+    if optimize_segments:
+        add_optimized_data(qr, data, qr_code_config['version'])
+    else:
+        qr.add_data(data)
+    version = qr.best_fit(start=qr_code_config['version'])
+    return version, version * 4 + 17
+
+def optimize_payload(url: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Canonicalize a URL and report the QR size before and after optimization.
+
+    Parameters:
+        url (str): The URL to optimize.
+        config (Dict[str, Any]): Validated configuration data.
+
+    Returns:
+        dict: 'payload' (the canonical URL), 'version_before', 'version_after',
+            'modules_before' and 'modules_after'.
+    """
+    payload = canonicalize_url(url)
+    version_before, modules_before = measure_payload(url, config)
+    version_after, modules_after = measure_payload(payload, config, optimize_segments=True)
+    logging.info(
+        f"Optimized payload {url} -> {payload}: version {version_before} -> {version_after}, "
+        f"{modules_before} -> {modules_after} modules"
+    )
+    return {
+        'payload': payload,
+        'version_before': version_before,
+        'version_after': version_after,
+        'modules_before': modules_before,
+        'modules_after': modules_after,
+    }
@@ -0,0 +1,184 @@
+# src/pipeline.py
+import queue
+import logging
+import threading
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from src.profiling import profile_thread
+
+_SENTINEL = object()
+
+class StageStats:
+    """Counters collected for one pipeline stage."""
+
+    def __init__(self, name: str, workers: int) -> None:
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.busy_time = 0.0
+        self.max_queue_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+        self._lock = threading.Lock()
+
+    def record(self, busy_time: float, queue_depth: int) -> None:
+        """
+        Record one processed item.
+
+        Parameters:
+            busy_time (float): Seconds spent processing the item.
+            queue_depth (int): Depth of the input queue when the item was taken.
+        """
+        with self._lock:
+            self.processed += 1
+            self.busy_time += busy_time
+            self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+            self._depth_total += queue_depth
+            self._depth_samples += 1
+
+    def as_dict(self, wall_time: float) -> Dict[str, float]:
+        """
+        Summarize the stage counters.
+
+        Parameters:
+            wall_time (float): Total wall time of the pipeline run in seconds.
+
+        Returns:
+            dict: Processed items, busy time, queue depth and utilization of the stage.
+        """
+        capacity = self.workers * wall_time
+        return {
+            'workers': self.workers,
+            'processed': self.processed,
+            'busy_time': self.busy_time,
+            'avg_queue_depth': self._depth_total / self._depth_samples if self._depth_samples else 0.0,
+            'max_queue_depth': self.max_queue_depth,
+            'utilization': self.busy_time / capacity if capacity else 0.0,
+        }
+
+class StagedPipeline:
+    """
+    Run items through a chain of stages, each backed by its own thread pool.
+
+    Stages are connected by bounded queues, so a slow stage applies back-pressure
+    to the ones before it instead of buffering the whole batch in memory. Pillow
+    releases the GIL while resizing, compositing and encoding, which lets the
+    stages overlap within a single process.
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[[Any], Any], int]], queue_size: int = 32) -> None:
+        """
+        Parameters:
+            stages (list): (name, function, worker count) for each stage, in order.
+                Each function receives the output of the previous stage.
+            queue_size (int): Maximum number of items waiting in front of each stage.
+
+        Raises:
+            ValueError: If no stages are given or a worker count is not positive.
+        """
+        if not stages:
+            raise ValueError("At least one pipeline stage is required.")
+        for name, _, workers in stages:
+            if workers < 1:
+                raise ValueError(f"Stage '{name}' must have at least one worker.")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats: List[StageStats] = [StageStats(name, workers) for name, _, workers in stages]
+        self.wall_time = 0.0
+        self._error: Optional[BaseException] = None
+        self._failed = threading.Event()
+
+    def _worker(self, func: Callable[[Any], Any], stats: StageStats,
+                in_queue: queue.Queue, out_queue: Optional[queue.Queue]) -> None:
+        with profile_thread():
+            self._process(func, stats, in_queue, out_queue)
+
+    def _process(self, func: Callable[[Any], Any], stats: StageStats,
+                 in_queue: queue.Queue, out_queue: Optional[queue.Queue]) -> None:
+        while True:
+            depth = in_queue.qsize()
+            item = in_queue.get()
+            if item is _SENTINEL:
+                return
+            # After a failure the remaining items are drained without processing
+            if self._failed.is_set():
+                continue
+            start_time = perf_counter()
+            try:
+                result = func(item)
+            except Exception as e:
+                logging.exception(f"Pipeline stage '{stats.name}' failed: {e}")
+                if not self._failed.is_set():
+                    self._error = e
+                    self._failed.set()
+                continue
+            stats.record(perf_counter() - start_time, depth)
+            if out_queue is not None:
+                out_queue.put(result)
+
+    def run(self, items: Iterable[Any]) -> Dict[str, Dict[str, float]]:
+        """
+        Feed the items through all stages and wait for them to finish.
+
+        Parameters:
+            items (Iterable[Any]): Input items for the first stage.
+
+        Returns:
+            dict: Per-stage statistics keyed by stage name (see StageStats.as_dict).
+
+        Raises:
+            Exception: The first exception raised by any stage function.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        pools: List[List[threading.Thread]] = []
+        for index, ((name, func, workers), stats) in enumerate(zip(self.stages, self.stats)):
+            out_queue = queues[index + 1] if index + 1 < len(queues) else None
+            threads = [
+                threading.Thread(target=self._worker, args=(func, stats, queues[index], out_queue),
+                                 name=f"{name}-{n}", daemon=True)
+                for n in range(workers)
+            ]
+            for thread in threads:
+                thread.start()
+            pools.append(threads)
+
+        start_time = perf_counter()
+        for item in items:
+            if self._failed.is_set():
+                break
+            queues[0].put(item)
+
+        # Shut stages down in order so every item reaches the end of the chain
+        for index, threads in enumerate(pools):
+            for _ in threads:
+                queues[index].put(_SENTINEL)
+            for thread in threads:
+                thread.join()
+        self.wall_time = perf_counter() - start_time
+
+        if self._error is not None:
+            raise self._error
+        return self.report()
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the per-stage statistics of the last run.
+
+        Returns:
+            dict: Per-stage statistics keyed by stage name.
+        """
+        return {stats.name: stats.as_dict(self.wall_time) for stats in self.stats}
+
+def log_pipeline_report(report: Dict[str, Dict[str, float]]) -> None:
+    """
+    Log the per-stage statistics returned by StagedPipeline.run.
+
+    Parameters:
+        report (dict): Per-stage statistics keyed by stage name.
+    """
+    for name, stats in report.items():
+        logging.info(
+            f"Stage {name}: {stats['processed']} item(s), {stats['workers']} worker(s), "
+            f"utilization {stats['utilization']:.0%}, "
+            f"queue depth avg {stats['avg_queue_depth']:.1f} / max {stats['max_queue_depth']}"
+        )
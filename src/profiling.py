@@ -0,0 +1,217 @@
+# src/profiling.py
+import io
+import os
+import pstats
+import logging
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from src.utils import ensure_directory_exists
+
+_stage_memory: Dict[str, Dict[str, int]] = {}
+_stage_memory_lock = threading.Lock()
+_call_stack = threading.local()
+# Peak seen before any reset_peak() call, so the run-wide peak survives stage accounting
+_run_peak = [0]
+# Profiles of worker threads collected while profile_call is running, or None when idle
+_thread_profiles: Optional[List[cProfile.Profile]] = None
+_thread_profiles_lock = threading.Lock()
+
+def track_memory(func):
+    """
+    Decorator that attributes peak traced memory to the decorated stage function.
+
+    It is a no-op unless tracemalloc is tracing (see MemoryTracer). Nested tracked
+    calls are accounted separately without hiding their allocations from the caller.
+    With several worker threads the peaks overlap, so figures are approximate.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not tracemalloc.is_tracing():
+            return func(*args, **kwargs)
+
+        stack = getattr(_call_stack, 'frames', None)
+        if stack is None:
+            stack = _call_stack.frames = []
+        # Fold the caller's peak so far into its frame before resetting the peak
+        current_peak = tracemalloc.get_traced_memory()[1]
+        if stack:
+            stack[-1][1] = max(stack[-1][1], current_peak)
+        with _stage_memory_lock:
+            _run_peak[0] = max(_run_peak[0], current_peak)
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        stack.append([start, start])
+        try:
+            return func(*args, **kwargs)
+        finally:
+            frame = stack.pop()
+            peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            with _stage_memory_lock:
+                stats = _stage_memory.setdefault(func.__name__, {'calls': 0, 'peak': 0, 'total_peak': 0})
+                stats['calls'] += 1
+                stats['peak'] = max(stats['peak'], peak - frame[0])
+                stats['total_peak'] += peak - frame[0]
+    return wrapper
+
+class MemoryTracer:
+    """
+    Context manager that traces allocations with tracemalloc for the duration of a run.
+
+    On exit it logs the peak allocation attributed to each function decorated with
+    track_memory, followed by the source lines that allocated the most memory
+    between the start and end snapshots.
+    """
+
+    def __init__(self, top_n: int = 10, frames: int = 1) -> None:
+        """
+        Parameters:
+            top_n (int): Number of allocation sites to report.
+            frames (int): Number of frames to store per allocation traceback.
+        """
+        self.top_n = top_n
+        self.frames = frames
+        self.peak = 0
+        self._start_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def __enter__(self) -> 'MemoryTracer':
+        with _stage_memory_lock:
+            _stage_memory.clear()
+            _run_peak[0] = 0
+        tracemalloc.start(self.frames)
+        self._start_snapshot = tracemalloc.take_snapshot()
+        logging.info("Memory tracing started.")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        end_snapshot = tracemalloc.take_snapshot()
+        with _stage_memory_lock:
+            self.peak = max(_run_peak[0], tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        self.log_report(end_snapshot)
+
+    def stage_report(self) -> Dict[str, Dict[str, int]]:
+        """
+        Return the per-stage memory statistics collected so far.
+
+        Returns:
+            dict: Calls, largest peak and summed peaks in bytes, keyed by function name.
+        """
+        with _stage_memory_lock:
+            return {name: dict(stats) for name, stats in _stage_memory.items()}
+
+    def log_report(self, end_snapshot: tracemalloc.Snapshot) -> None:
+        """
+        Log the per-stage peaks and the top allocation sites of the run.
+
+        Parameters:
+            end_snapshot (tracemalloc.Snapshot): Snapshot taken at the end of the run.
+        """
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, pstats.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ]
+        end_snapshot = end_snapshot.filter_traces(filters)
+        start_snapshot = self._start_snapshot.filter_traces(filters)
+
+        logging.info(f"Traced memory peak: {self.peak / 1024:.1f} KiB")
+        for name, stats in sorted(self.stage_report().items(), key=lambda item: item[1]['peak'], reverse=True):
+            logging.info(
+                f"Stage {name}: {stats['calls']} call(s), peak {stats['peak'] / 1024:.1f} KiB, "
+                f"mean peak {stats['total_peak'] / stats['calls'] / 1024:.1f} KiB"
+            )
+        for stat in end_snapshot.compare_to(start_snapshot, 'lineno')[:self.top_n]:
+            logging.info(f"Allocation: {stat}")
+
+@contextmanager
+def profile_thread() -> Iterator[None]:
+    """
+    Profile the current worker thread while profile_call is running.
+
+    cProfile only sees the thread that enabled it, so worker threads wrap their
+    loop in this context manager; their profiles are merged into the main one
+    by profile_call. It is a no-op when no profile is being recorded.
+    """
+    with _thread_profiles_lock:
+        active = _thread_profiles is not None
+    if not active:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows a single active profiler, which already sees every thread
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        with _thread_profiles_lock:
+            if _thread_profiles is not None:
+                _thread_profiles.append(profiler)
+
+def profile_call(func: Callable[[], Any], output_path: str, top_n: int = 20) -> Any:
+    """
+    Run a function under cProfile and write the results.
+
+    Worker threads that use profile_thread (such as the StagedPipeline workers)
+    are profiled as well and merged into the same statistics. The raw statistics
+    are written to output_path for use with pstats or snakeviz; a text summary
+    of the top_n functions by cumulative time is written next to it with a
+    '.txt' extension and logged.
+
+    Parameters:
+        func (Callable[[], Any]): The function to profile.
+        output_path (str): Path of the '.pstats' file to write.
+        top_n (int): Number of hot functions to include in the summary.
+
+    Returns:
+        Any: The return value of func.
+    """
+    global _thread_profiles
+    ensure_directory_exists(os.path.dirname(output_path) or '.')
+    profiler = cProfile.Profile()
+    with _thread_profiles_lock:
+        _thread_profiles = []
+    try:
+        return profiler.runcall(func)
+    finally:
+        with _thread_profiles_lock:
+            thread_profiles, _thread_profiles = _thread_profiles, None
+        stats = pstats.Stats(profiler)
+        for thread_profile in thread_profiles:
+            stats.add(thread_profile)
+        stats.dump_stats(output_path)
+        summary = summarize_profile(output_path, top_n)
+        summary_path = os.path.splitext(output_path)[0] + '.txt'
+        with open(summary_path, 'w') as file:
+            file.write(summary)
+        logging.info(f"Profile written to: {output_path}")
+        logging.info(f"Top {top_n} functions by cumulative time:\n{summary}")
+
+def summarize_profile(stats_path: str, top_n: int = 20) -> str:
+    """
+    Format the top functions of a '.pstats' file by cumulative time.
+
+    Parameters:
+        stats_path (str): Path to the '.pstats' file.
+        top_n (int): Number of functions to include.
+
+    Returns:
+        str: The formatted summary.
+    """
+    buffer = io.StringIO()
+    stats = pstats.Stats(stats_path, stream=buffer)
+    stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top_n)
+    return buffer.getvalue()
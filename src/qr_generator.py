@@ -2,11 +2,15 @@ import qrcode
 from PIL import Image
 import logging
 from typing import Optional
+from src.profiling import track_memory
+from src.payload_optimizer import add_optimized_data
 
+@track_memory
 def generate_qr_code(data: str, fill_color: str = 'black', back_color: str = 'white',
                      version: int = 1, box_size: int = 10, border: int = 4,
                      width: int = 300, height: int = 300, error_correction: str = 'H',
-                     quiet_zone: int = 4, scale: float = 1.0) -> Image.Image:
+                     quiet_zone: int = 4, scale: float = 1.0,
+                     optimize_segments: bool = False) -> Image.Image:
     """
     Generate a QR code image.
 
@@ -22,6 +26,8 @@ def generate_qr_code(data: str, fill_color: str = 'black', back_color: str = 'wh
         error_correction (str): Error correction level ('L', 'M', 'Q', 'H').
         quiet_zone (int): Minimum quiet zone width (modules).
         scale (float): Scaling factor for the entire QR code.
+        optimize_segments (bool): Split the data into numeric, alphanumeric and byte
+            segments with the fewest bits instead of qrcode's default chunking.
 
     Returns:
         Image.Image: The generated QR code image.
@@ -33,7 +39,10 @@ def generate_qr_code(data: str, fill_color: str = 'black', back_color: str = 'wh
         box_size=box_size,
         border=max(border, quiet_zone),
     )
-    qr.add_data(data)
+    if optimize_segments:
+        add_optimized_data(qr, data, version)
+    else:
+        qr.add_data(data)
     qr.make(fit=True)
 
     img = qr.make_image(fill_color=fill_color, back_color=back_color).convert('RGBA')
@@ -0,0 +1,106 @@
+# src/renderer.py
+import os
+import logging
+from typing import Any, Dict, Optional
+from PIL import Image
+from src.qr_generator import generate_qr_code
+from src.image_utils import apply_gradient, apply_background_image
+from src.logo_embedder import embed_logo
+
+def build_output_name(service_name: str, base_name: str, variant: Optional[str] = None) -> str:
+    """
+    Build the file name used for a QR code with logo.
+
+    Parameters:
+        service_name (str): Name of the service (e.g., 'Website').
+        base_name (str): Base name derived from the primary URL.
+        variant (str, optional): Name of the colorway variant, if any.
+
+    Returns:
+        str: The output file name.
+    """
+    if variant:
+        return f"{service_name}@{base_name}_{variant}_QR_with_logo.png"
+    return f"{service_name}@{base_name}_QR_with_logo.png"
+
+def encode_qr(data: str, config: Dict[str, Any], fill_color: Optional[str] = None,
+              back_color: Optional[str] = None) -> Image.Image:
+    """
+    Encode the data into a QR code image using the 'appearance' and 'qr_code' settings.
+
+    Parameters:
+        data (str): The data to encode in the QR code.
+        config (Dict[str, Any]): Validated configuration data.
+        fill_color (str, optional): Overrides 'appearance.fill_color'.
+        back_color (str, optional): Overrides 'appearance.back_color'.
+
+    Returns:
+        Image.Image: The generated QR code image.
+    """
+    appearance = config['appearance']
+    qr_code_config = config['qr_code']
+    return generate_qr_code(
+        data,
+        fill_color=fill_color or appearance['fill_color'],
+        back_color=back_color or appearance['back_color'],
+        version=qr_code_config['version'],
+        box_size=qr_code_config['box_size'],
+        border=qr_code_config['border'],
+        width=qr_code_config['width'],
+        height=qr_code_config['height'],
+        error_correction=qr_code_config['error_correction'],
+        quiet_zone=qr_code_config['quiet_zone'],
+        scale=qr_code_config['scale'],
+        optimize_segments=qr_code_config.get('optimize_payload', False)
+    )
+
+def compose_qr(qr_img: Image.Image, config: Dict[str, Any]) -> Image.Image:
+    """
+    Apply the configured gradient, background image and logo to a QR code image.
+
+    The logo step is skipped when 'output.logo_path' is empty.
+
+    Parameters:
+        qr_img (Image.Image): The QR code image.
+        config (Dict[str, Any]): Validated configuration data.
+
+    Returns:
+        Image.Image: The composed QR code image with logo.
+    """
+    appearance = config['appearance']
+    gradient = appearance.get('gradient')
+    background_image = config['qr_code'].get('background_image')
+
+    # Apply gradient if enabled
+    if gradient and gradient.get('enabled'):
+        qr_img = apply_gradient(qr_img, gradient['start_color'], gradient['end_color'])
+
+    # Apply background image if provided
+    if background_image and os.path.exists(background_image):
+        qr_img = apply_background_image(qr_img, background_image)
+
+    logo_path = config['output']['logo_path']
+    if not logo_path:
+        return qr_img
+
+    return embed_logo(
+        qr_img,
+        logo_path,
+        logo_size_ratio=appearance['logo_size_ratio'],
+        padding=appearance['padding'],
+        shape=config['logo']['shape']
+    )
+
+def render_qr(data: str, config: Dict[str, Any]) -> Image.Image:
+    """
+    Run the full encode and compose chain for a single payload.
+
+    Parameters:
+        data (str): The data to encode in the QR code.
+        config (Dict[str, Any]): Validated configuration data.
+
+    Returns:
+        Image.Image: The composed QR code image with logo.
+    """
+    logging.debug(f"Rendering QR code for: {data}")
+    return compose_qr(encode_qr(data, config), config)
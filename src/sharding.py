@@ -0,0 +1,214 @@
+# src/sharding.py
+import os
+import hashlib
+import logging
+import threading
+from typing import Callable, Iterable, List, Set, Tuple, TypeVar
+from src.utils import ensure_directory_exists
+
+T = TypeVar('T')
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Parse a shard specification of the form 'i/N' (0 <= i < N).
+
+    Parameters:
+        spec (str): The shard specification, e.g. '2/8'.
+
+    Returns:
+        tuple: The shard index and the shard count.
+
+    Raises:
+        ValueError: If the specification is malformed or out of range.
+    """
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}'. Expected 'i/N', e.g. '0/4'.") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}'. The index must satisfy 0 <= i < N.")
+    return index, count
+
+def shard_of(payload: str, count: int) -> int:
+    """
+    Map a payload to a shard with a hash that is stable across processes and machines.
+
+    Python's built-in hash() is salted per process, so a digest is used instead.
+
+    Parameters:
+        payload (str): The payload to place.
+        count (int): Number of shards.
+
+    Returns:
+        int: The shard index in [0, count).
+    """
+    digest = hashlib.sha256(payload.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+def record_key(name: str, payload: str) -> str:
+    """
+    Build the checkpoint key of a record from its name and payload.
+
+    The key includes a stable hash of the payload, so a record whose URL was edited
+    since the checkpoint was written no longer counts as completed.
+
+    Parameters:
+        name (str): Name of the record (e.g., its output file name).
+        payload (str): The payload encoded for the record.
+
+    Returns:
+        str: The checkpoint key, '<name>\t<sha256 of payload>'.
+    """
+    return f"{name}\t{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+def select_shard(records: Iterable[T], index: int, count: int,
+                 payload: Callable[[T], str] = str) -> List[T]:
+    """
+    Keep the records whose payload belongs to the given shard.
+
+    Parameters:
+        records (Iterable[T]): Records to partition.
+        index (int): Shard index.
+        count (int): Number of shards.
+        payload (Callable[[T], str]): Returns the payload to hash for a record.
+
+    Returns:
+        List[T]: The records of this shard, in their original order.
+    """
+    return [record for record in records if shard_of(payload(record), count) == index]
+
+def shard_path(path: str, index: int, count: int) -> str:
+    """
+    Insert the shard into a file name, e.g. 'codes.zip' -> 'codes.shard-0-of-4.zip'.
+
+    Unsharded runs (count == 1) and stdout ('-') keep the path unchanged.
+
+    Parameters:
+        path (str): The original path.
+        index (int): Shard index.
+        count (int): Number of shards.
+
+    Returns:
+        str: The path for this shard.
+    """
+    if count == 1 or path == '-':
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.shard-{index}-of-{count}{ext}"
+
+def part_path(path: str, part: int) -> str:
+    """
+    Insert an archive part number into a file name, e.g. 'codes.zip' -> 'codes.part-2.zip'.
+
+    Part 0 and stdout ('-') keep the path unchanged.
+
+    Parameters:
+        path (str): The archive path.
+        part (int): Part number.
+
+    Returns:
+        str: The path of this part.
+    """
+    if part == 0 or path == '-':
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.part-{part}{ext}"
+
+def archive_key(path: str) -> str:
+    """
+    Build the checkpoint key recording that an archive part holds completed records.
+
+    Parameters:
+        path (str): Path of the archive part.
+
+    Returns:
+        str: The checkpoint key, 'archive\t<path>'.
+    """
+    return f"archive\t{path}"
+
+class Checkpoint:
+    """
+    Append-only record of completed work, so an interrupted run can resume.
+
+    Each completed record key is written as one line and flushed immediately;
+    a torn last line from a crash is ignored on load. Safe to share between threads.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the checkpoint file, loading the records completed by earlier runs.
+
+        Parameters:
+            path (str): Path to the checkpoint file.
+        """
+        self.path = path
+        self.completed: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, 'rb+') as file:
+                content = file.read()
+                # Anything after the last newline is a partial write from a crash; drop it
+                complete = content[:content.rfind(b'\n') + 1]
+                if len(complete) != len(content):
+                    file.truncate(len(complete))
+            self.completed.update(line for line in complete.decode('utf-8').split('\n') if line)
+            logging.info(f"Resuming from checkpoint {path}: {len(self.completed)} record(s) already completed.")
+        else:
+            ensure_directory_exists(os.path.dirname(path) or '.')
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def is_done(self, key: str) -> bool:
+        """
+        Check whether a record was completed by this or an earlier run.
+
+        Parameters:
+            key (str): The record key.
+
+        Returns:
+            bool: True if the record is completed.
+        """
+        return key in self.completed
+
+    def mark_done(self, *keys: str) -> None:
+        """
+        Record that the given records are completed.
+
+        Parameters:
+            keys (str): The record keys.
+        """
+        with self._lock:
+            for key in keys:
+                if key not in self.completed:
+                    self.completed.add(key)
+                    self._file.write(f"{key}\n")
+            self._file.flush()
+
+    def next_archive_part(self, path: str) -> str:
+        """
+        Return the first part of an archive that holds no checkpointed records.
+
+        Resumed runs write their archive to a new part instead of truncating the
+        parts written by earlier runs. A part left behind by a crash holds no
+        checkpointed records, so it is reused.
+
+        Parameters:
+            path (str): The archive path.
+
+        Returns:
+            str: The path of the part to write.
+        """
+        part = 0
+        while path != '-' and self.is_done(archive_key(part_path(path, part))):
+            part += 1
+        return part_path(path, part)
+
+    def close(self) -> None:
+        """Flush and close the checkpoint file."""
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> 'Checkpoint':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,185 @@
+# src/variants.py
+import os
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from PIL import Image, ImageColor, ImageOps
+from src.renderer import encode_qr, compose_qr
+from src.logo_embedder import prepare_logo_layer, apply_logo_layer
+from src.profiling import track_memory
+
+# Logo layers and backgrounds only depend on the output size, so they are shared across payloads
+_cached_logo_layer = lru_cache(maxsize=8)(prepare_logo_layer)
+
+@lru_cache(maxsize=8)
+def _cached_background(background_image: str, size: Tuple[int, int]) -> Image.Image:
+    return Image.open(background_image).convert("RGBA").resize(size)
+
+def load_variants(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Read the colorway variants from the optional 'variants' section.
+
+    Missing colors fall back to the 'appearance' settings. Like 'appearance.gradient',
+    a variant gradient is only applied when its 'enabled' flag is set.
+
+    Parameters:
+        config (Dict[str, Any]): Validated configuration data.
+
+    Returns:
+        List[Dict[str, Any]]: Variants with 'name', 'fill_color', 'back_color' and 'gradient'
+            (None unless enabled).
+
+    Raises:
+        ValueError: If a variant has no name or a name is used twice.
+    """
+    appearance = config['appearance']
+    variants = []
+    names = set()
+    for entry in config.get('variants') or []:
+        name = entry.get('name')
+        if not name:
+            logging.error(f"Variant without a name: {entry}")
+            raise ValueError("Every entry in 'variants' must have a 'name'.")
+        if name in names:
+            logging.error(f"Duplicate variant name: {name}")
+            raise ValueError(f"Duplicate variant name: {name}")
+        names.add(name)
+        gradient = entry.get('gradient')
+        variants.append({
+            'name': name,
+            'fill_color': entry.get('fill_color', appearance['fill_color']),
+            'back_color': entry.get('back_color', appearance['back_color']),
+            'gradient': gradient if gradient and gradient.get('enabled') else None,
+        })
+    return variants
+
+def generate_qr_mask(data: str, config: Dict[str, Any]) -> Image.Image:
+    """
+    Render the QR code once as a grayscale mask (255 = module, 0 = background).
+
+    The mask goes through the same resize as a regular render, so colorizing
+    it yields the same anti-aliased edges as rendering with those colors.
+
+    Parameters:
+        data (str): The data to encode in the QR code.
+        config (Dict[str, Any]): Validated configuration data.
+
+    Returns:
+        Image.Image: The 'L' mode mask.
+    """
+    return encode_qr(data, config, fill_color='white', back_color='black').convert('L')
+
+def blend_palette(fill_color: str, back_color: str) -> List[int]:
+    """
+    Build a 256-entry RGB palette blending from back_color (index 0) to fill_color (index 255).
+
+    Parameters:
+        fill_color (str): Foreground color (name or hex code).
+        back_color (str): Background color (name or hex code).
+
+    Returns:
+        List[int]: Flat [r, g, b, ...] palette.
+    """
+    fill_rgb = ImageColor.getrgb(fill_color)[:3]
+    back_rgb = ImageColor.getrgb(back_color)[:3]
+    palette = []
+    for level in range(256):
+        palette.extend((back * (255 - level) + fill * level + 127) // 255 for back, fill in zip(back_rgb, fill_rgb))
+    return palette
+
+def colorize_mask(mask: Image.Image, fill_color: str, back_color: str,
+                  gradient: Optional[Dict[str, str]] = None) -> Image.Image:
+    """
+    Derive a colored QR code from a mask with a palette swap or a single composite pass.
+
+    Parameters:
+        mask (Image.Image): Mask returned by generate_qr_mask, or its 'P' mode copy.
+            Passing the 'P' copy saves a conversion when recoloring many variants.
+        fill_color (str): Foreground color (name or hex code).
+        back_color (str): Background color (name or hex code).
+        gradient (dict, optional): 'start_color' and 'end_color' of a top-to-bottom
+            gradient applied to the modules instead of fill_color.
+
+    Returns:
+        Image.Image: The colored RGBA QR code image.
+    """
+    if not gradient:
+        # The mask levels double as palette indices, so recoloring is a palette swap
+        indexed = mask.convert('P') if mask.mode == 'L' else mask.copy()
+        indexed.putpalette(blend_palette(fill_color, back_color))
+        return indexed.convert('RGBA')
+
+    alpha = mask if mask.mode == 'L' else mask.convert('L')
+    fill_layer = ImageOps.colorize(
+        Image.linear_gradient('L').resize(alpha.size),
+        black=gradient['start_color'],
+        white=gradient['end_color']
+    )
+    back_layer = Image.new('RGB', alpha.size, ImageColor.getrgb(back_color))
+    return Image.composite(fill_layer, back_layer, alpha).convert('RGBA')
+
+def compose_from_mask(mask: Image.Image, config: Dict[str, Any]) -> Image.Image:
+    """
+    Derive the primary QR code from a mask with the 'appearance' colors and compose it.
+
+    Parameters:
+        mask (Image.Image): Mask returned by generate_qr_mask.
+        config (Dict[str, Any]): Validated configuration data.
+
+    Returns:
+        Image.Image: The composed QR code image with logo.
+    """
+    appearance = config['appearance']
+    return compose_qr(colorize_mask(mask, appearance['fill_color'], appearance['back_color']), config)
+
+@track_memory
+def render_variants(data: str, config: Dict[str, Any], variants: Optional[List[Dict[str, Any]]] = None,
+                    mask: Optional[Image.Image] = None) -> List[Tuple[str, Image.Image]]:
+    """
+    Render all colorway variants of a payload from a single QR code mask.
+
+    The payload is encoded once; each variant is then a palette swap (or, with a
+    gradient, one composite) of the mask plus one paste of the shared logo layer,
+    instead of a full encode and compose.
+
+    Parameters:
+        data (str): The data to encode in the QR code.
+        config (Dict[str, Any]): Validated configuration data.
+        variants (List[Dict[str, Any]], optional): Variants to render. Defaults to load_variants(config).
+        mask (Image.Image, optional): Mask of the data, if it was already generated
+            (e.g., for the primary image); otherwise it is generated here.
+
+    Returns:
+        List[Tuple[str, Image.Image]]: (variant name, image) pairs.
+    """
+    if variants is None:
+        variants = load_variants(config)
+    if not variants:
+        return []
+
+    if mask is None:
+        mask = generate_qr_mask(data, config)
+    background_image = config['qr_code'].get('background_image')
+    background = None
+    if background_image and os.path.exists(background_image):
+        background = _cached_background(background_image, mask.size)
+
+    layer = None
+    logo_path = config['output']['logo_path']
+    if logo_path:
+        appearance = config['appearance']
+        layer = _cached_logo_layer(mask.size, logo_path, appearance['logo_size_ratio'],
+                                   appearance['padding'], config['logo']['shape'])
+
+    indexed = mask.convert('P')
+    rendered = []
+    for variant in variants:
+        source = mask if variant['gradient'] else indexed
+        img = colorize_mask(source, variant['fill_color'], variant['back_color'], variant['gradient'])
+        if background is not None:
+            img = Image.alpha_composite(background, img)
+        if layer is not None:
+            img = apply_logo_layer(img, layer)
+        rendered.append((variant['name'], img))
+    logging.debug(f"Rendered {len(rendered)} variant(s) for: {data}")
+    return rendered
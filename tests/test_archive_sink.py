@@ -0,0 +1,47 @@
+# tests/test_archive_sink.py
+import unittest
+from src.archive_sink import ArchiveSink
+from PIL import Image
+import tarfile
+import tempfile
+import zipfile
+import os
+
+class TestArchiveSink(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.img = Image.new('RGBA', (40, 40), (0, 0, 0, 255))
+        self.name = 'Website@example.com_QR_with_logo.png'
+
+    def tearDown(self):
+        for file_name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, file_name))
+        os.rmdir(self.temp_dir)
+
+    def test_zip_archive(self):
+        archive_path = os.path.join(self.temp_dir, 'codes.zip')
+        with ArchiveSink(archive_path, 'zip') as sink:
+            sink.write_image(self.img, self.name)
+
+        with zipfile.ZipFile(archive_path) as archive:
+            self.assertEqual(archive.namelist(), [self.name])
+            self.assertEqual(archive.getinfo(self.name).compress_type, zipfile.ZIP_STORED)
+            self.assertTrue(archive.read(self.name).startswith(b'\x89PNG'))
+
+    def test_tar_archive(self):
+        archive_path = os.path.join(self.temp_dir, 'codes.tar')
+        with ArchiveSink(archive_path, 'tar') as sink:
+            sink.write_image(self.img, self.name)
+            sink.write_bytes('second.png', b'data')
+
+        with tarfile.open(archive_path) as archive:
+            self.assertEqual(archive.getnames(), [self.name, 'second.png'])
+            self.assertEqual(archive.extractfile('second.png').read(), b'data')
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            ArchiveSink(os.path.join(self.temp_dir, 'codes.rar'), 'rar')
+
+if __name__ == '__main__':
+    unittest.main()
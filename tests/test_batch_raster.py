@@ -0,0 +1,48 @@
+# tests/test_batch_raster.py
+import unittest
+from src.batch_raster import build_matrix, expand_modules, group_by_size, rasterize_masks, render_batch
+from src.variants import generate_qr_mask
+from src.renderer import encode_qr
+from PIL import ImageChops
+import numpy as np
+
+class TestBatchRaster(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {
+            'output': {'logo_path': None},
+            'appearance': {'fill_color': 'black', 'back_color': 'white', 'logo_size_ratio': 5, 'padding': 10},
+            'qr_code': {'version': 1, 'error_correction': 'H', 'box_size': 10, 'border': 4, 'width': 300,
+                        'height': 300, 'quiet_zone': 4, 'scale': 1.0},
+            'logo': {'shape': 'circle'}
+        }
+        self.payloads = ['https://example.com', 'https://example.com/a/much/longer/path?with=query', 'https://x.y']
+
+    def test_expand_modules(self):
+        matrices = np.array([[[True, False], [False, True]]] * 3)
+        pixels = expand_modules(matrices, 3)
+        self.assertEqual(pixels.shape, (3, 6, 6))
+        self.assertEqual(pixels.dtype, np.uint8)
+        np.testing.assert_array_equal(pixels[1], np.kron(matrices[1], np.ones((3, 3), dtype=np.uint8)) * 255)
+
+    def test_group_by_size(self):
+        matrices = [build_matrix(data, self.config) for data in self.payloads]
+        groups = group_by_size(matrices)
+        self.assertEqual(sorted(index for indices, _ in groups.values() for index in indices), [0, 1, 2])
+        for modules, (indices, stacked) in groups.items():
+            self.assertEqual(stacked.shape, (len(indices), modules, modules))
+
+    def test_rasterize_masks_matches_single_render(self):
+        masks = rasterize_masks(self.payloads, self.config)
+        for data, mask in zip(self.payloads, masks):
+            self.assertIsNone(ImageChops.difference(mask, generate_qr_mask(data, self.config)).getbbox())
+
+    def test_render_batch(self):
+        images = render_batch(self.payloads, self.config)
+        for data, img in zip(self.payloads, images):
+            self.assertEqual(img.mode, 'RGBA')
+            difference = ImageChops.difference(img.convert('RGB'), encode_qr(data, self.config).convert('RGB'))
+            self.assertLessEqual(max(high for _, high in difference.getextrema()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
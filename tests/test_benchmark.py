@@ -0,0 +1,31 @@
+# tests/test_benchmark.py
+import unittest
+from benchmark import synthesize_urls, percentile, add_parallel_efficiency
+from src.utils import validate_url
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_synthesize_urls(self):
+        urls = synthesize_urls(50, seed=1)
+        self.assertEqual(len(urls), 50)
+        self.assertEqual(urls, synthesize_urls(50, seed=1))
+        for url in urls:
+            validate_url(url)  # Should not raise an exception
+
+    def test_percentile(self):
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(values, 0.50), 50.0)
+        self.assertEqual(percentile(values, 0.99), 99.0)
+        self.assertEqual(percentile([], 0.50), 0.0)
+
+    def test_add_parallel_efficiency(self):
+        results = [
+            {'size': 300, 'features': 'plain', 'workers': 1, 'codes_per_sec': 10.0},
+            {'size': 300, 'features': 'plain', 'workers': 4, 'codes_per_sec': 30.0},
+        ]
+        add_parallel_efficiency(results)
+        self.assertEqual(results[0]['parallel_efficiency'], 1.0)
+        self.assertAlmostEqual(results[1]['parallel_efficiency'], 0.75)
+
+if __name__ == '__main__':
+    unittest.main()
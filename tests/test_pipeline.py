@@ -0,0 +1,44 @@
+# tests/test_pipeline.py
+import unittest
+from src.pipeline import StagedPipeline
+import threading
+
+class TestStagedPipeline(unittest.TestCase):
+
+    def test_run_processes_all_items(self):
+        results = []
+        lock = threading.Lock()
+
+        def collect(value):
+            with lock:
+                results.append(value)
+
+        pipeline = StagedPipeline(
+            [('double', lambda value: value * 2, 2), ('increment', lambda value: value + 1, 3), ('collect', collect, 1)],
+            queue_size=4
+        )
+        report = pipeline.run(range(50))
+
+        self.assertEqual(sorted(results), [value * 2 + 1 for value in range(50)])
+        self.assertEqual(list(report), ['double', 'increment', 'collect'])
+        for stats in report.values():
+            self.assertEqual(stats['processed'], 50)
+            self.assertLessEqual(stats['max_queue_depth'], 4)
+            self.assertGreaterEqual(stats['utilization'], 0.0)
+
+    def test_run_raises_stage_error(self):
+        def fail(value):
+            if value == 3:
+                raise RuntimeError("boom")
+            return value
+
+        pipeline = StagedPipeline([('fail', fail, 2), ('sink', lambda value: None, 1)])
+        with self.assertRaises(RuntimeError):
+            pipeline.run(range(10))
+
+    def test_invalid_worker_count(self):
+        with self.assertRaises(ValueError):
+            StagedPipeline([('encode', lambda value: value, 0)])
+
+if __name__ == '__main__':
+    unittest.main()
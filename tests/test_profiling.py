@@ -0,0 +1,62 @@
+# tests/test_profiling.py
+import unittest
+from src.profiling import MemoryTracer, profile_call, track_memory
+from src.pipeline import StagedPipeline
+import pstats
+import tempfile
+import shutil
+import os
+
+@track_memory
+def allocate(size):
+    return bytearray(size)
+
+@track_memory
+def allocate_nested(size):
+    return allocate(size) + allocate_nested_inner(size)
+
+@track_memory
+def allocate_nested_inner(size):
+    return bytearray(size)
+
+class TestProfiling(unittest.TestCase):
+
+    def test_track_memory_without_tracing(self):
+        self.assertEqual(len(allocate(10)), 10)
+
+    def test_memory_tracer_attributes_stages(self):
+        with MemoryTracer() as tracer:
+            allocate(1024 * 1024)
+            allocate_nested(256 * 1024)
+            report = tracer.stage_report()
+
+        self.assertEqual(report['allocate']['calls'], 2)
+        self.assertGreaterEqual(report['allocate']['peak'], 1024 * 1024)
+        self.assertGreaterEqual(report['allocate_nested']['peak'], 512 * 1024)
+        self.assertGreaterEqual(tracer.peak, 1024 * 1024)
+
+    def test_profile_call(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            stats_path = os.path.join(temp_dir, 'run.pstats')
+            result = profile_call(lambda: allocate(16), stats_path, top_n=5)
+            self.assertEqual(len(result), 16)
+            self.assertTrue(os.path.exists(stats_path))
+            with open(os.path.join(temp_dir, 'run.txt')) as file:
+                self.assertIn('cumulative', file.read())
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_profile_call_includes_worker_threads(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            stats_path = os.path.join(temp_dir, 'run.pstats')
+            pipeline = StagedPipeline([('allocate', allocate, 2)])
+            profile_call(lambda: pipeline.run([16] * 10), stats_path, top_n=5)
+            calls = {name: stat[1] for (_, _, name), stat in pstats.Stats(stats_path).stats.items()}
+            self.assertEqual(calls.get('allocate'), 10)
+        finally:
+            shutil.rmtree(temp_dir)
+
+if __name__ == '__main__':
+    unittest.main()
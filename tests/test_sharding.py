@@ -0,0 +1,108 @@
+# tests/test_sharding.py
+import unittest
+from src.sharding import Checkpoint, archive_key, parse_shard, part_path, record_key, select_shard, shard_of, shard_path
+from src.archive_sink import ArchiveSink
+import zipfile
+import tempfile
+import shutil
+import os
+
+class TestSharding(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.checkpoint_path = os.path.join(self.temp_dir, 'checkpoints', 'shard-0-of-2.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard('0/1'), (0, 1))
+        self.assertEqual(parse_shard('3/8'), (3, 8))
+        for spec in ['8/8', '-1/4', '1/0', '1', 'a/b', '1/2/3']:
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_select_shard_partitions_records(self):
+        urls = [f'https://example.com/item/{index}' for index in range(200)]
+        shards = [select_shard(urls, index, 4) for index in range(4)]
+        self.assertEqual(sorted(url for shard in shards for url in shard), sorted(urls))
+        self.assertTrue(all(shards))
+        # The hash is stable, not salted per process
+        self.assertEqual(shard_of('https://example.com', 1000), shard_of('https://example.com', 1000))
+
+    def test_select_shard_with_payload(self):
+        jobs = [('Website', 'https://example.com'), ('TikTok', 'https://tiktok.com/@example')]
+        selected = select_shard(jobs, 0, 1, payload=lambda job: job[1])
+        self.assertEqual(selected, jobs)
+
+    def test_shard_path(self):
+        self.assertEqual(shard_path('out/codes.zip', 1, 4), 'out/codes.shard-1-of-4.zip')
+        self.assertEqual(shard_path('out/codes.zip', 0, 1), 'out/codes.zip')
+        self.assertEqual(shard_path('-', 1, 4), '-')
+
+    def test_checkpoint_resume(self):
+        with Checkpoint(self.checkpoint_path) as checkpoint:
+            checkpoint.mark_done('a.png', 'b.png')
+            self.assertTrue(checkpoint.is_done('a.png'))
+
+        # Simulate a crash in the middle of writing a record
+        with open(self.checkpoint_path, 'a') as file:
+            file.write('c.p')
+
+        with Checkpoint(self.checkpoint_path) as checkpoint:
+            self.assertEqual(checkpoint.completed, {'a.png', 'b.png'})
+            checkpoint.mark_done('c.png')
+
+        with Checkpoint(self.checkpoint_path) as checkpoint:
+            self.assertEqual(checkpoint.completed, {'a.png', 'b.png', 'c.png'})
+
+    def test_checkpoint_resume_with_changed_url(self):
+        jobs = {'Website': 'https://example.com', 'TikTok': 'https://tiktok.com/@example'}
+        with Checkpoint(self.checkpoint_path) as checkpoint:
+            checkpoint.mark_done(*(record_key(f'{name}@example.com_QR_with_logo.png', url) for name, url in jobs.items()))
+
+        # The TikTok URL is edited between runs, so only that record is rendered again
+        jobs['TikTok'] = 'https://tiktok.com/@someoneelse'
+        with Checkpoint(self.checkpoint_path) as checkpoint:
+            pending = [name for name, url in jobs.items()
+                       if not checkpoint.is_done(record_key(f'{name}@example.com_QR_with_logo.png', url))]
+        self.assertEqual(pending, ['TikTok'])
+        self.assertNotEqual(record_key('a.png', 'https://example.com'), record_key('b.png', 'https://example.com'))
+
+    def test_part_path(self):
+        self.assertEqual(part_path('out/codes.shard-0-of-4.zip', 0), 'out/codes.shard-0-of-4.zip')
+        self.assertEqual(part_path('out/codes.shard-0-of-4.zip', 2), 'out/codes.shard-0-of-4.part-2.zip')
+        self.assertEqual(part_path('-', 2), '-')
+
+    def test_checkpoint_resume_with_archive(self):
+        archive_path = os.path.join(self.temp_dir, 'codes.zip')
+
+        def archive_run(names):
+            # Mirrors main.run: render into the next free part, then checkpoint the part and its records
+            with Checkpoint(self.checkpoint_path) as checkpoint:
+                pending = [name for name in names if not checkpoint.is_done(record_key(name, name))]
+                path = checkpoint.next_archive_part(archive_path)
+                with ArchiveSink(path, 'zip') as sink:
+                    for name in pending:
+                        sink.write_bytes(name, b'data')
+                checkpoint.mark_done(archive_key(path), *(record_key(name, name) for name in pending))
+            return path
+
+        self.assertEqual(archive_run(['Website.png']), archive_path)
+        # A crash while writing the second part leaves an unrecorded part behind, which is reused
+        with open(os.path.join(self.temp_dir, 'codes.part-1.zip'), 'wb') as file:
+            file.write(b'PK')
+        second = archive_run(['Website.png', 'Instagram.png'])
+        self.assertEqual(second, os.path.join(self.temp_dir, 'codes.part-1.zip'))
+
+        # The resumed run must not truncate the part written by the first run
+        with zipfile.ZipFile(archive_path) as archive:
+            self.assertEqual(archive.namelist(), ['Website.png'])
+        with zipfile.ZipFile(second) as archive:
+            self.assertEqual(archive.namelist(), ['Instagram.png'])
+        with Checkpoint(self.checkpoint_path) as checkpoint:
+            self.assertEqual(checkpoint.next_archive_part(archive_path), os.path.join(self.temp_dir, 'codes.part-2.zip'))
+
+if __name__ == '__main__':
+    unittest.main()
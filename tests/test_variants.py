@@ -0,0 +1,79 @@
+# tests/test_variants.py
+import unittest
+from src.variants import colorize_mask, compose_from_mask, generate_qr_mask, load_variants, render_variants
+from src.renderer import encode_qr
+from PIL import Image, ImageChops
+import os
+
+class TestVariants(unittest.TestCase):
+
+    def setUp(self):
+        self.data = 'https://example.com'
+        self.logo_path = 'tests/test_variant_logo.png'
+        Image.new('RGBA', (50, 50), (255, 0, 0, 255)).save(self.logo_path)
+        self.config = {
+            'output': {'logo_path': self.logo_path},
+            'appearance': {'fill_color': 'black', 'back_color': 'white', 'logo_size_ratio': 5, 'padding': 10},
+            'qr_code': {'version': 1, 'error_correction': 'H', 'box_size': 10, 'border': 4, 'width': 300,
+                        'height': 300, 'quiet_zone': 4, 'scale': 1.0},
+            'logo': {'shape': 'circle'},
+            'variants': [
+                {'name': 'navy', 'fill_color': '#1d3557', 'back_color': '#f1faee'},
+                {'name': 'fade', 'gradient': {'enabled': True, 'start_color': '#000000', 'end_color': '#3050a0'}},
+            ]
+        }
+
+    def tearDown(self):
+        if os.path.exists(self.logo_path):
+            os.remove(self.logo_path)
+
+    def test_colorize_matches_direct_render(self):
+        mask = generate_qr_mask(self.data, self.config)
+        self.assertEqual(mask.mode, 'L')
+        recolored = colorize_mask(mask, 'black', 'white')
+        rendered = encode_qr(self.data, self.config)
+        difference = ImageChops.difference(recolored.convert('RGB'), rendered.convert('RGB'))
+        self.assertLessEqual(max(high for _, high in difference.getextrema()), 1)
+
+    def test_colorize_palette_swap(self):
+        indexed = generate_qr_mask(self.data, self.config).convert('P')
+        recolored = colorize_mask(indexed, '#1d3557', '#f1faee')
+        self.assertEqual(recolored.getpixel((0, 0)), (0xf1, 0xfa, 0xee, 255))
+        # The shared indexed mask keeps its original palette
+        self.assertEqual(indexed.getpalette()[:6], [0, 0, 0, 1, 1, 1])
+
+    def test_render_variants(self):
+        variants = render_variants(self.data, self.config)
+        self.assertEqual([name for name, _ in variants], ['navy', 'fade'])
+        for _, img in variants:
+            self.assertEqual(img.size, (300, 300))
+            self.assertEqual(img.mode, 'RGBA')
+            # The logo is pasted in the center of every variant
+            self.assertEqual(img.getpixel((150, 150)), (255, 0, 0, 255))
+
+    def test_render_variants_from_existing_mask(self):
+        mask = generate_qr_mask(self.data, self.config)
+        primary = compose_from_mask(mask, self.config)
+        self.assertEqual(primary.size, (300, 300))
+        self.assertEqual(primary.getpixel((150, 150)), (255, 0, 0, 255))
+        # A mask of a different payload proves the given mask is used instead of a new encode
+        other = generate_qr_mask('https://example.org/other', self.config)
+        for (_, reused), (_, encoded) in zip(render_variants(self.data, self.config, mask=other),
+                                             render_variants('https://example.org/other', self.config)):
+            self.assertIsNone(ImageChops.difference(reused, encoded).getbbox())
+
+    def test_load_variants(self):
+        variants = load_variants(self.config)
+        self.assertEqual(variants[1]['back_color'], 'white')
+        self.assertIsNotNone(variants[1]['gradient'])
+
+        self.config['variants'][1]['gradient']['enabled'] = False
+        self.assertIsNone(load_variants(self.config)[1]['gradient'])
+        self.assertEqual(load_variants({'appearance': self.config['appearance']}), [])
+
+        self.config['variants'].append({'fill_color': 'red'})
+        with self.assertRaises(ValueError):
+            load_variants(self.config)
+
+if __name__ == '__main__':
+    unittest.main()